@@ -51,10 +51,110 @@ try:
 except ImportError:
     pass
 
+# Types that can be indexed directly instead of being stepped through.
+_SEQUENCE_TYPES = (bytearray, bytes, list, memoryview, range, str, tuple)
+# Types NumPy can view as arrays of numbers.
+_ARRAY_TYPES: Tuple[type, ...] = (memoryview,)
+try:
+    from array import array
+
+    _SEQUENCE_TYPES += (array,)
+    _ARRAY_TYPES += (array,)
+except ImportError:
+    pass
+
+# NumPy is optional: when present, some functions hand whole arrays to it.
+# It is only imported once such an array is seen, and _np is then the
+# module, or False if it is missing.
+_np: Any = None
+
+
+def _numpy() -> Any:
+    """The numpy module, imported on first use, or False if missing."""
+    global _np  # noqa: PLW0603
+    if _np is None:
+        try:
+            import numpy
+
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np
+
+
+def _add(x: Any, y: Any) -> Any:
+    """The default function of accumulate()."""
+    return x + y
+
+
+# Functions accumulate() recognizes, mapped to the operation they perform.
+_OPERATIONS = {_add: "add", max: "max", min: "min"}
+try:
+    import operator
+
+    _OPERATIONS.update(
+        {
+            operator.add: "add",
+            operator.mul: "mul",
+            operator.and_: "and",
+            operator.or_: "or",
+            operator.xor: "xor",
+        }
+    )
+except ImportError:
+    pass
+
+
+def _operation(func: Callable[..., Any]) -> Optional[str]:
+    """The name of the operation func performs, if it is a known one."""
+    try:
+        return _OPERATIONS.get(func)
+    except TypeError:  # unhashable callable
+        return None
+
+
+def _as_ndarray(values: Any) -> Any:
+    """View a NumPy array, array.array or memoryview as a one-dimensional
+    NumPy array, or return None if that is not possible."""
+    np = None
+    if isinstance(values, _ARRAY_TYPES) or getattr(type(values), "__module__", "") == "numpy":
+        np = _numpy()
+    if not np:
+        return None
+    if isinstance(values, np.ndarray):
+        return values if values.ndim == 1 else None
+    try:
+        result = np.asarray(values)
+    except (TypeError, ValueError):
+        return None
+    if result.ndim != 1:
+        return None
+    if result.dtype.kind == "f":
+        # Items of array('f') become Python floats, so compute in double.
+        result = result.astype(np.float64, copy=False)
+    return result
+
+
+def _from_ndarray(result: Any, source: Any) -> Iterator[Any]:
+    """Iterate over a NumPy result computed from source, producing the same
+    item types as iterating over source itself would."""
+    if isinstance(source, _np.ndarray):
+        return iter(result)
+    return _ndarray_items(result)
+
+
+def _ndarray_items(result: Any) -> Iterator[Any]:
+    # Convert a block at a time, so the first item comes without converting
+    # the whole result into a list of Python objects.
+    for start in range(0, len(result), 1024):
+        yield from result[start : start + 1024].tolist()
+
 
 def accumulate(
     iterable: Iterable[_T],
-    func: Callable[[_T, _T], _T] = lambda x, y: x + y,  # type: ignore[operator]
+    func: Callable[[_T, _T], _T] = _add,
+    *,
+    initial: Optional[_T] = None,
 ) -> Iterator[_T]:
     """Make an iterator that returns accumulated sums, or accumulated
     results of other binary functions (specified via the optional func
@@ -66,16 +166,86 @@ def accumulate(
     is empty, the output iterable will also be empty.
 
     :param iterable: the source of values to be accumulated
-    :param func: the function to combine the accumulated value with the next one"""
-    it = iter(iterable)
-    try:
-        acc = next(it)
-    except StopIteration:
-        return
+    :param func: the function to combine the accumulated value with the next one
+    :param initial: if given, the accumulation starts with this value, which
+                    is also produced first
+
+    Addition, multiplication, max, min and the bitwise operators of the
+    operator module are applied inline rather than through a function
+    call. When iterable is a one-dimensional NumPy array of floats, running
+    sums, products, maximums and minimums are computed by NumPy. Other
+    arrays are accumulated lazily, one item at a time."""
+    operation = _operation(func)
+    values = _as_ndarray(iterable) if initial is None else None
+    if values is not None and values is iterable and values.dtype.kind == "f":
+        result = _accumulate_ndarray(values, operation)
+        if result is not None:
+            return iter(result)
+    return _accumulate(iter(iterable), func, operation, initial)
+
+
+def _accumulate_ndarray(values: Any, operation: Optional[str]) -> Any:
+    if operation == "add":
+        return _np.cumsum(values)
+    if operation == "mul":
+        return _np.cumprod(values)
+    if operation in {"max", "min"} and not (_np.isnan(values).any() or (values == 0).any()):
+        # NumPy propagates NaN and may pick either signed zero, where max()
+        # and min() keep the earlier of two values that compare equal.
+        return (_np.maximum if operation == "max" else _np.minimum).accumulate(values)
+    return None
+
+
+def _accumulate(
+    it: Iterator[_T],
+    func: Callable[[_T, _T], _T],
+    operation: Optional[str],
+    initial: Optional[_T],
+) -> Iterator[_T]:
+    acc: Any
+    if initial is None:
+        try:
+            acc = next(it)
+        except StopIteration:
+            return
+    else:
+        acc = initial
     yield acc
-    for element in it:
-        acc = func(acc, element)
-        yield acc
+    # Not augmented assignments: those would modify a yielded list in place.
+    if operation == "add":
+        for element in it:
+            acc = acc + element  # noqa: PLR6104
+            yield acc
+    elif operation == "mul":
+        for element in it:
+            acc = acc * element  # noqa: PLR6104
+            yield acc
+    elif operation == "max":
+        for element in it:
+            if element > acc:  # noqa: PLR1730
+                acc = element
+            yield acc
+    elif operation == "min":
+        for element in it:
+            if element < acc:  # noqa: PLR1730
+                acc = element
+            yield acc
+    elif operation == "and":
+        for element in it:
+            acc = acc & element  # noqa: PLR6104
+            yield acc
+    elif operation == "or":
+        for element in it:
+            acc = acc | element  # noqa: PLR6104
+            yield acc
+    elif operation == "xor":
+        for element in it:
+            acc = acc ^ element  # noqa: PLR6104
+            yield acc
+    else:
+        for element in it:
+            acc = func(acc, element)
+            yield acc
 
 
 def chain(*iterables: Iterable[_T]) -> Iterator[_T]:
@@ -104,7 +274,67 @@ def chain_from_iterable(iterables: Iterable[Iterable[_T]]) -> Iterator[_T]:
             yield element
 
 
-def combinations(iterable: Iterable[_T], r: int) -> Iterator[Tuple[_T, ...]]:
+def _comb(n: int, k: int) -> int:
+    """The number of ways to choose k items from n, without order."""
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    c = 1
+    for i in range(k):
+        c = c * (n - i) // (i + 1)
+    return c
+
+
+def _perm(n: int, k: int) -> int:
+    """The number of ways to choose k items from n, with order."""
+    if k < 0 or k > n:
+        return 0
+    c = 1
+    for i in range(n - k + 1, n + 1):
+        c *= i
+    return c
+
+
+def _shard_range(total: int, shard: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """The [start, stop) positions of shard k of n over total outputs."""
+    if shard is None:
+        return 0, total
+    k, n = shard
+    if not 0 <= k < n:
+        raise ValueError("shard must be (k, n) with 0 <= k < n")
+    return total * k // n, total * (k + 1) // n
+
+
+def _combination_indices(n: int, r: int, index: int) -> List[int]:
+    """The pool positions of the combination at position index in the output
+    of combinations() over a pool of n."""
+    c = _comb(n, r)
+    size = n
+    result = []
+    while r:
+        c, n, r = c * r // n, n - 1, r - 1
+        while index >= c:
+            index -= c
+            c, n = c * (n - r) // n, n - 1
+        result.append(size - 1 - n)
+    return result
+
+
+def _permutation_digits(n: int, r: int, index: int) -> List[int]:
+    """The permutation at position index in the output of permutations() over
+    a pool of n, as positions in the list of items not chosen yet."""
+    digits = [0] * r
+    for i in range(r - 1, -1, -1):
+        index, digits[i] = divmod(index, n - i)
+    return digits
+
+
+def combinations(
+    iterable: Iterable[_T],
+    r: int,
+    shard: Optional[Tuple[int, int]] = None,
+    reuse: bool = False,
+) -> Iterator[Tuple[_T, ...]]:
     """Return r length subsequences of elements from the input iterable.
     Combinations are emitted in lexicographic sort order. So, if the input
     iterable is sorted, the combination tuples will be produced in sorted order.
@@ -113,33 +343,62 @@ def combinations(iterable: Iterable[_T], r: int) -> Iterator[Tuple[_T, ...]]:
     So if the input elements are unique, there will be no repeat values in each
     combination.
 
+    If shard is given as (k, n), the output is cut into n contiguous pieces
+    of near equal size and only piece k is produced. It starts directly at
+    its first combination, so the n pieces can be generated by separate
+    workers without overlap, gaps or wasted work.
+
+    If reuse is True, a single list is yielded over and over, updated in
+    place for each combination. That avoids building a tuple per step, but
+    the consumer must copy any combination it wants to keep.
+
     :param iterable: the iterable containing the the items to combine
     :param r: the length of the resulting combinations
+    :param shard: the (k, n) piece of the output to produce (default is None,
+                  meaning all of it)
+    :param reuse: yield the same list every time (default is False)
 
     """
     # combinations('ABCD', 2) --> AB AC AD BC BD CD
     # combinations(range(4), 3) --> 012 013 023 123
+    # combinations('ABCD', 2, shard=(1, 2)) --> BC BD CD
     pool = tuple(iterable)
     n = len(pool)
     if r > n:
         return
-    indices = list(range(r))
-    yield tuple(pool[i] for i in indices)
+    start, stop = _shard_range(_comb(n, r), shard)
+    remaining = stop - start
+    if remaining <= 0:
+        return
+    indices = _combination_indices(n, r, start)
+    # The result is kept alongside the indices and only the positions that
+    # change are updated, so no generator is needed to build each tuple.
+    result = [pool[i] for i in indices]
+    top = [i + n - r for i in range(r)]
+    positions = list(range(r - 1, -1, -1))
     while True:
-        index = 0
-        for i in reversed(range(r)):
-            if indices[i] != i + n - r:
-                index = i
-                break
-        else:
+        yield result if reuse else tuple(result)  # type: ignore[misc]
+        remaining -= 1
+        if not remaining:
             return
-        indices[index] += 1
+        for index in positions:
+            if indices[index] != top[index]:
+                break
+        i = indices[index] + 1
+        indices[index] = i
+        result[index] = pool[i]
         for j in range(index + 1, r):
-            indices[j] = indices[j - 1] + 1
-        yield tuple(pool[i] for i in indices)
+            i += 1
+            indices[j] = i
+            result[j] = pool[i]
 
 
-def combinations_with_replacement(iterable: Iterable[_T], r: int) -> Iterator[Tuple[_T, ...]]:
+def combinations_with_replacement(
+    iterable: Iterable[_T],
+    r: int,
+    shard: Optional[Tuple[int, int]] = None,
+    reuse: bool = False,
+) -> Iterator[Tuple[_T, ...]]:
     """Return r length subsequences of elements from the input iterable allowing
     individual elements to be repeated more than once.
 
@@ -150,8 +409,15 @@ def combinations_with_replacement(iterable: Iterable[_T], r: int) -> Iterator[Tu
     So if the input elements are unique, the generated combinations will also be
     unique.
 
+    If shard is given as (k, n), only the k-th of n contiguous pieces of the
+    output is produced, and if reuse is True a single list is updated in place
+    and yielded each time, as for combinations().
+
     :param iterable: the iterable containing the the items to combine
     :param r: the length of the resulting combinations
+    :param shard: the (k, n) piece of the output to produce (default is None,
+                  meaning all of it)
+    :param reuse: yield the same list every time (default is False)
 
     """
     # combinations_with_replacement('ABC', 2) --> AA AB AC BB BC CC
@@ -159,30 +425,49 @@ def combinations_with_replacement(iterable: Iterable[_T], r: int) -> Iterator[Tu
     n = len(pool)
     if not n and r:
         return
-    indices = [0] * r
-    yield tuple(pool[i] for i in indices)
+    # Adding i to the i-th index maps these one to one onto plain
+    # combinations of r items out of n + r - 1.
+    start, stop = _shard_range(_comb(n + r - 1, r) if n else 1, shard)
+    remaining = stop - start
+    if remaining <= 0:
+        return
+    indices = [c - i for i, c in enumerate(_combination_indices(n + r - 1, r, start))]
+    result = [pool[i] for i in indices]
+    positions = list(range(r - 1, -1, -1))
     while True:
-        index = 0
-        for i in reversed(range(r)):
-            if indices[i] != n - 1:
-                index = i
+        yield result if reuse else tuple(result)  # type: ignore[misc]
+        remaining -= 1
+        if not remaining:
+            return
+        for index in positions:
+            if indices[index] != n - 1:
                 break
+        i = indices[index] + 1
+        if index == r - 1:
+            indices[index] = i
+            result[index] = pool[i]
         else:
-            return
-        indices[index:] = [indices[index] + 1] * (r - index)
-        yield tuple(pool[i] for i in indices)
+            indices[index:] = [i] * (r - index)
+            result[index:] = [pool[i]] * (r - index)
 
 
 def compress(data: Iterable[_T], selectors: Iterable[Any]) -> Iterable[_T]:
     """Make an iterator that filters elements from data returning only those
     that have a corresponding element in selectors that evaluates to True.
     Stops when either the data or selectors iterables has been exhausted.
+    When NumPy is available and both are arrays, NumPy selects the
+    elements.
 
     :param data: the source of values
     :param selector: the source of selection values
 
     """
     # compress('ABCDEF', [1,0,1,0,1,1]) --> A C E F
+    values = _as_ndarray(data)
+    mask = _as_ndarray(selectors)
+    if values is not None and mask is not None and mask.dtype.kind in "biufc":
+        n = min(len(values), len(mask))
+        return _from_ndarray(values[:n][mask[:n] != 0], data)
     return (d for d, s in zip(data, selectors) if s)
 
 
@@ -200,12 +485,97 @@ def count(start: _N = 0, step: _N = 1) -> Iterator[_N]:
         start += step
 
 
-def cycle(p: Iterable[_T]) -> Iterator[_T]:
+class _Cache:
+    """A compact store for a sequence of values: ints in an array('q'),
+    floats in an array('d'), bytes joined in a bytearray with their end
+    offsets, anything else in a list. Values are added a block at a time,
+    and the first block chooses the kind; a later block that does not fit
+    turns the cache into a list. It can be iterated over many times."""
+
+    BLOCK = 1024
+
+    def __init__(self, iterable: Iterable[Any] = ()) -> None:
+        self.kind: Optional[type] = None
+        self.items: Any = []
+        self.data = bytearray()
+        iterator = iter(iterable)
+        while True:
+            block = list(islice(iterator, self.BLOCK))
+            if not block:
+                break
+            self.extend(block)
+
+    def extend(self, block: List[Any]) -> None:
+        """Add a block of values."""
+        if not block or self.kind is list:
+            self.items.extend(block)
+            return
+        types = set(map(type, block))
+        kind = types.pop() if len(types) == 1 else list
+        if self.kind is None:
+            self.kind = self._start(kind)
+        if kind is not self.kind:
+            self._to_list()
+            self.items.extend(block)
+        elif kind is bytes:
+            end = len(self.data)
+            for value in block:
+                end += len(value)
+                self.items.append(end)
+            self.data.extend(b"".join(block))
+        else:
+            length = len(self.items)
+            try:
+                self.items.extend(block)
+            except OverflowError:
+                del self.items[length:]
+                self._to_list()
+                self.items.extend(block)
+
+    def _start(self, kind: type) -> type:
+        try:
+            if kind is int:
+                self.items = array("q")
+            elif kind is float:
+                self.items = array("d")
+            elif kind is bytes:
+                self.items = array("q")
+            else:
+                return list
+        except (NameError, ValueError):  # no array module, or no 'q' type
+            return list
+        return kind
+
+    def _to_list(self) -> None:
+        self.items = list(self)
+        self.data = bytearray()
+        self.kind = list
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.kind is bytes:
+            return self._iter_bytes()
+        return iter(self.items)
+
+    def _iter_bytes(self) -> Iterator[bytes]:
+        view = memoryview(self.data)
+        start = 0
+        for end in self.items:
+            yield bytes(view[start:end])
+            start = end
+
+
+def cycle(p: Iterable[_T], compact: bool = False) -> Iterator[_T]:
     """Make an iterator returning elements from the iterable and saving a copy
     of each. When the iterable is exhausted, return elements from the saved
     copy. Repeats indefinitely.
 
     :param p: the iterable from which to yield elements
+    :param compact: if True, save ints, floats or bytes in arrays rather than
+                    as one object each, when all the elements have the same
+                    of these types. This takes less memory for long inputs.
 
     """
     try:
@@ -213,15 +583,32 @@ def cycle(p: Iterable[_T]) -> Iterator[_T]:
     except TypeError:
         # len() is not defined for this type. Assume it is
         # a finite iterable so we must cache the elements.
-        cache = []
-        for i in p:
-            yield i
-            cache.append(i)
-        p = cache
+        if compact:
+            p = yield from _cycle_compact(p)
+        else:
+            cache = []
+            for i in p:
+                yield i
+                cache.append(i)
+            p = cache
     while p:
         yield from p
 
 
+def _cycle_compact(p: Iterable[_T]) -> Iterator[_T]:
+    """The first pass of cycle(), saving into a _Cache and returning it."""
+    cache = _Cache()
+    block = []
+    for i in p:
+        yield i
+        block.append(i)
+        if len(block) == _Cache.BLOCK:
+            cache.extend(block)
+            block = []
+    cache.extend(block)
+    return cache  # type: ignore[return-value]
+
+
 def dropwhile(predicate: _Predicate[_T], iterable: Iterable[_T]) -> Iterator[_T]:
     """Make an iterator that drops elements from the iterable as long as the
     predicate is true; afterwards, returns every element. Note, the iterator
@@ -280,8 +667,21 @@ class groupby:
     visible. So, if that data is needed later, it should be stored as a
     list.
 
+    When presorted is True and the iterable is a sequence such as a list,
+    array, range, str or memoryview, the caller promises that all the
+    elements with the same key are next to each other, as they are once
+    sorted. The end of each group is then found by galloping: the key is
+    computed at exponentially growing distances, then by binary search,
+    so a group of n elements costs O(log n) key computations. Each group is
+    a slice of the sequence rather than an iterator, which remains valid
+    after groupby() is advanced. Groups of bytes, bytearray, array and
+    memoryview inputs are memoryview slices sharing the input's buffer
+    (a bytearray cannot be resized while they exist); groups of other
+    sequences, such as lists and tuples, are copies.
+
     :param iterable: the source of values
     :param key: the key computation function (default is None)
+    :param presorted: whether equal keys are known to be contiguous
 
     """
 
@@ -292,8 +692,19 @@ class groupby:
         self,
         iterable: Iterable[_T],
         key: Optional[Callable[[_T], Any]] = None,
+        presorted: bool = False,
     ):
         self.keyfunc = key if key is not None else lambda x: x
+        self.sequence: Any = None
+        if presorted and isinstance(iterable, _SEQUENCE_TYPES):
+            self.sequence = iterable
+            # Slice buffers through one view so that groups are not copied.
+            if isinstance(iterable, (bytes, bytearray) + _ARRAY_TYPES):
+                self.slices: Any = memoryview(iterable)  # type: ignore[arg-type]
+            else:
+                self.slices = iterable
+            self.position = 0
+            return
         self.it = iter(iterable)
         # Sentinel values, not actually returned during iteration.
         self.currvalue: _T = object()  # type: ignore[assignment]
@@ -303,6 +714,8 @@ class groupby:
         return self
 
     def __next__(self) -> Tuple[Any, Iterator[_T]]:
+        if self.sequence is not None:
+            return self._next_slice()
         self.id = object()
         while self.currkey == self.tgtkey:
             self.currvalue = next(self.it)  # Exit on StopIteration
@@ -319,6 +732,32 @@ class groupby:
                 return
             self.currkey = self.keyfunc(self.currvalue)
 
+    def _next_slice(self) -> Tuple[Any, Any]:
+        sequence = self.sequence
+        keyfunc = self.keyfunc
+        n = len(sequence)
+        start = self.position
+        if start >= n:
+            raise StopIteration
+        key = keyfunc(sequence[start])
+        # Gallop: lo is in the group, hi is past it or not yet checked.
+        lo = start
+        hi = start + 1
+        step = 1
+        while hi < n and keyfunc(sequence[hi]) == key:
+            lo = hi
+            step += step
+            hi = lo + step
+        hi = min(hi, n)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if keyfunc(sequence[mid]) == key:
+                lo = mid
+            else:
+                hi = mid
+        self.position = hi
+        return key, self.slices[start:hi]
+
 
 def islice(
     p: Iterable[_T],
@@ -336,11 +775,17 @@ def islice(
     results in items being skipped. If stop is None, then iteration
     continues until iterable is exhausted, if at all; otherwise, it
     stops at the specified position. If stop is specified and is not
-    None, and is not greater than start then nothing is returned. Unlike
-    regular slicing, islice() does not support negative values for
-    start, stop, or step. Can be used to extract related fields from
-    data where the internal structure has been flattened (for example, a
-    multi-line report may list a name field on every third line).
+    None, and is not greater than start then nothing is returned. Can be
+    used to extract related fields from data where the internal structure
+    has been flattened (for example, a multi-line report may list a name
+    field on every third line).
+
+    Lists, tuples, ranges, strings, bytes, bytearrays, memoryviews and
+    arrays (but not subclasses of them) are indexed directly, so skipped
+    elements cost nothing. Unlike
+    itertools.islice(), negative start and stop count from the end as in
+    regular slicing. For other iterables this holds back a buffer of at
+    most -start or -stop elements. step must be positive.
 
     :param p: the iterator items come from
     :param start: the index of the first item
@@ -353,23 +798,82 @@ def islice(
     if stop == ():
         stop = start
         start = 0
-    if stop is not None and stop < 0:
-        raise ValueError("stop must be None or >= 0")
-    if start < 0:
-        raise ValueError("start must be >= 0")
     if step <= 0:
         raise ValueError("step must be > 0")
 
+    if type(p) in _SEQUENCE_TYPES:
+        if start < 0 or (stop is not None and stop < 0):
+            indices = range(len(p))[start:stop:step]  # type: ignore[arg-type]
+            start, stop = indices.start, indices.stop
+        return _islice_sequence(p, start, stop, step)  # type: ignore[arg-type]
+    if start < 0:
+        return _islice_last(iter(p), start, stop, step)
+    return _islice(iter(p), start, stop, step)
+
+
+def _islice_sequence(p: Sequence[_T], start: int, stop: Optional[int], step: int) -> Iterator[_T]:
+    """islice() for a sequence, indexing it directly."""
+    # The length is checked at every step, so a sequence that grows or
+    # shrinks while it is read behaves as it does with iter(p).
+    i = start
+    while i < len(p) and (stop is None or i < stop):
+        yield p[i]
+        i += step
+
+
+def _islice_last(it: Iterator[_T], start: int, stop: Optional[int], step: int) -> Iterator[_T]:
+    """islice() for a negative start over an iterator."""
+    # Only the last -start items can be selected: keep them in a ring
+    # buffer and slice once the length is known.
+    size = 0
+    buf: List[_T] = []
+    oldest = 0
+    for value in it:
+        size += 1
+        if len(buf) < -start:
+            buf.append(value)
+        else:
+            buf[oldest] = value
+            oldest += 1
+            if oldest == -start:
+                oldest = 0
+    buf = buf[oldest:] + buf[:oldest]
+    first = size - len(buf)
+    for i in range(size)[start:stop:step]:
+        yield buf[i - first]
+
+
+def _islice(it: Iterator[_T], start: int, stop: Optional[int], step: int) -> Iterator[_T]:
+    """islice() for a non-negative start over an iterator."""
     # TODO: optimizing or breaking semantics?
-    if stop is not None and start >= stop:
+    if stop is not None and 0 <= stop <= start:
         return
-    it = iter(p)
     for _ in range(start):
         try:
             next(it)
         except StopIteration:
             return
 
+    if stop is not None and stop < 0:
+        # An item is only known not to be among the last -stop ones once
+        # -stop more have been read, so hold them back in a ring buffer.
+        delay = -stop
+        buf: List[_T] = []
+        oldest = 0
+        position = -delay
+        for value in it:
+            if len(buf) < delay:
+                buf.append(value)
+            else:
+                if not position % step:
+                    yield buf[oldest]
+                buf[oldest] = value
+                oldest += 1
+                if oldest == delay:
+                    oldest = 0
+            position += 1
+        return
+
     while True:
         try:
             val = next(it)
@@ -386,7 +890,12 @@ def islice(
             return
 
 
-def permutations(iterable: Iterable[_T], r: Optional[int] = None) -> Iterator[Tuple[_T, ...]]:
+def permutations(
+    iterable: Iterable[_T],
+    r: Optional[int] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    reuse: bool = False,
+) -> Iterator[Tuple[_T, ...]]:
     """Return successive r length permutations of elements in the iterable.
 
     If r is not specified or is None, then r defaults to the length of the
@@ -400,8 +909,15 @@ def permutations(iterable: Iterable[_T], r: Optional[int] = None) -> Iterator[Tu
     value. So if the input elements are unique, there will be no repeat
     values in each permutation.
 
+    If shard is given as (k, n), only the k-th of n contiguous pieces of the
+    output is produced, and if reuse is True a single list is updated in place
+    and yielded each time, as for combinations().
+
     :param iterable: the source of values
     :param r: the permutation length
+    :param shard: the (k, n) piece of the output to produce (default is None,
+                  meaning all of it)
+    :param reuse: yield the same list every time (default is False)
 
     """
     # permutations('ABCD', 2) --> AB AC AD BA BC BD CA CB CD DA DB DC
@@ -411,11 +927,25 @@ def permutations(iterable: Iterable[_T], r: Optional[int] = None) -> Iterator[Tu
     r = n if r is None else r
     if r > n:
         return
-    indices = list(range(n))
-    cycles = list(range(n, n - r, -1))
-    yield tuple(pool[i] for i in indices[:r])
-    while n:
-        for i in reversed(range(r)):
+    start, stop = _shard_range(_perm(n, r), shard)
+    remaining = stop - start
+    if remaining <= 0:
+        return
+    # Rebuild the state the loop below has reached after start steps: each
+    # chosen index is followed by the unchosen ones in ascending order, and
+    # cycles counts the choices left at each position.
+    digits = _permutation_digits(n, r, start)
+    unchosen = list(range(n))
+    indices = [unchosen.pop(d) for d in digits] + unchosen
+    cycles = [n - i - d for i, d in enumerate(digits)]
+    result = [pool[i] for i in indices[:r]]
+    positions = list(range(r - 1, -1, -1))
+    while True:
+        yield result if reuse else tuple(result)  # type: ignore[misc]
+        remaining -= 1
+        if not remaining:
+            return
+        for i in positions:
             cycles[i] -= 1
             if cycles[i] == 0:
                 indices[i:] = indices[i + 1 :] + indices[i : i + 1]
@@ -423,14 +953,13 @@ def permutations(iterable: Iterable[_T], r: Optional[int] = None) -> Iterator[Tu
             else:
                 j = cycles[i]
                 indices[i], indices[-j] = indices[-j], indices[i]
-                yield tuple(pool[i] for i in indices[:r])
+                # Positions from i onwards are the only ones that changed.
+                for k in range(i, r):
+                    result[k] = pool[indices[k]]
                 break
-        else:
-            return
 
 
-# def product(*args: Iterable[_T], r: int = 1) -> Iterator[Tuple[_T, ...]]:
-def product(*args: Iterable[Any], r: int = 1) -> Iterator[Tuple[Any, ...]]:
+class product:
     """Cartesian product of input iterables.
 
     Roughly equivalent to nested for-loops in a generator expression. For
@@ -446,19 +975,75 @@ def product(*args: Iterable[Any], r: int = 1) -> Iterator[Tuple[Any, ...]]:
     repetitions with the optional repeat keyword argument. For example,
     product(A, repeat=4) means the same as product(A, A, A, A).
 
+    Tuples are generated one at a time: only one index per pool is kept, so
+    memory use does not grow with the size of the product. The remaining
+    attribute holds how many tuples are still to be produced; it is not
+    offered through len(), which cannot report counts this large. start_index
+    resumes the sequence at the given position without generating the
+    earlier tuples.
+
+    If shard is given as (k, n), only the k-th of n contiguous pieces of the
+    tuples from start_index onwards is produced, as for combinations().
+
     :param args: sources of values
     :param r: number of times to duplicate the (single) arg for taking a
               product with itself (default is 1)
+    :param start_index: the position of the first tuple to produce (default is 0)
+    :param shard: the (k, n) piece of the output to produce (default is None,
+                  meaning all of it)
 
     """
+
     # product('ABCD', 'xy') --> Ax Ay Bx By Cx Cy Dx Dy
     # product(range(2), repeat=3) --> 000 001 010 011 100 101 110 111
-    pools = [tuple(pool) for pool in args] * r
-    result: List[List[Any]] = [[]]
-    for pool in pools:
-        result = [x + [y] for x in result for y in pool]
-    for prod in result:
-        yield tuple(prod)
+    # product('ABCD', 'xy', start_index=5) --> Cy Dx Dy
+
+    def __init__(
+        self,
+        *args: Iterable[Any],
+        r: int = 1,
+        start_index: int = 0,
+        shard: Optional[Tuple[int, int]] = None,
+    ):
+        if start_index < 0:
+            raise ValueError("start_index must be >= 0")
+        self.pools = [tuple(pool) for pool in args] * r
+        size = 1
+        for pool in self.pools:
+            size *= len(pool)
+        start, stop = _shard_range(max(size - start_index, 0), shard)
+        start_index += start
+        self.remaining = stop - start
+        self.indices = [0] * len(self.pools)
+        self.result: List[Any] = []
+        if self.remaining:
+            # Decompose start_index into odometer digits, rightmost first.
+            for i in range(len(self.pools) - 1, -1, -1):
+                start_index, self.indices[i] = divmod(start_index, len(self.pools[i]))
+            self.result = [pool[i] for pool, i in zip(self.pools, self.indices)]
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return self
+
+    def __next__(self) -> Tuple[Any, ...]:
+        if not self.remaining:
+            raise StopIteration
+        self.remaining -= 1
+        pools = self.pools
+        indices = self.indices
+        current = self.result
+        result = tuple(current)
+        if self.remaining:
+            for i in range(len(indices) - 1, -1, -1):
+                pool = pools[i]
+                j = indices[i] + 1
+                if j < len(pool):
+                    indices[i] = j
+                    current[i] = pool[j]
+                    break
+                indices[i] = 0
+                current[i] = pool[0]
+        return result
 
 
 def repeat(el: _T, n: Optional[int] = None) -> Iterator[_T]:
@@ -510,40 +1095,135 @@ def takewhile(predicate: _Predicate[_T], iterable: Iterable[_T]) -> Iterator[_T]
             break
 
 
+class _TeeBuffer:
+    """Ring buffer shared by the iterators returned from tee(). It holds the
+    items between the slowest and the fastest consumer; everything older has
+    been seen by all consumers and is released."""
+
+    def __init__(self, iterable: Iterable[_T], n: int):
+        self.it = iter(iterable)
+        self.items: List[Any] = [None] * 8  # capacity is always a power of 2
+        self.head = 0  # position of the oldest buffered item
+        self.tail = 0  # position one past the newest buffered item
+        self.cursors = [0] * n
+        self.exhausted = False
+
+    def fetch(self, k: int) -> _T:
+        pos = self.cursors[k]
+        items = self.items
+        if pos == self.tail:
+            if self.exhausted:
+                raise StopIteration
+            try:
+                value = next(self.it)
+            except StopIteration:
+                self.exhausted = True
+                raise
+            if self.tail - self.head == len(items):
+                items = self._grow()
+            items[self.tail & (len(items) - 1)] = value
+            self.tail += 1
+        value = items[pos & (len(items) - 1)]
+        self.cursors[k] = pos + 1
+        if pos == self.head:
+            # The slowest consumer may have moved on, release what it read.
+            head = min(self.cursors)
+            for i in range(self.head, head):
+                items[i & (len(items) - 1)] = None
+            self.head = head
+        return value
+
+    def _grow(self) -> List[Any]:
+        old = self.items
+        items: List[Any] = [None] * (2 * len(old))
+        for i in range(self.head, self.tail):
+            items[i & (len(items) - 1)] = old[i & (len(old) - 1)]
+        self.items = items
+        return items
+
+
+class _tee:
+    """One of the independent iterators returned by tee()."""
+
+    def __init__(self, buffer: _TeeBuffer, k: int):
+        self.buffer = buffer
+        self.k = k
+
+    def __iter__(self) -> Iterator[_T]:
+        return self
+
+    def __next__(self) -> _T:
+        return self.buffer.fetch(self.k)
+
+    def buffered(self) -> int:
+        """Return the number of items currently held in the buffer shared by
+        this iterator and its siblings."""
+        return self.buffer.tail - self.buffer.head
+
+
 def tee(iterable: Iterable[_T], n: int = 2) -> Sequence[Iterator[_T]]:
     """Return n independent iterators from a single iterable.
 
+    The iterators share one buffer that only holds the items read by the
+    fastest iterator but not yet by the slowest one, so the memory used
+    grows with how far apart the iterators are rather than with the length
+    of the iterable. Each returned iterator has a buffered() method reporting
+    the number of items currently held.
+
+    Once tee() has been called, the original iterable should not be used
+    anywhere else, otherwise it could get advanced without the tee objects
+    being informed.
+
     :param iterable: the iterator from which to make iterators.
     :param n: the number of iterators to make (default is 2)
 
     """
-    return [iter(iterable) for _ in range(n)]
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    buffer = _TeeBuffer(iterable, n)
+    return [_tee(buffer, k) for k in range(n)]
 
 
-def zip_longest(*args: Iterable[Any], fillvalue: _OptionalFill = None) -> Iterator[Tuple[Any, ...]]:
+def zip_longest(
+    *args: Iterable[Any], fillvalue: _OptionalFill = None, strict: bool = False
+) -> Iterator[Tuple[Any, ...]]:
     """Make an iterator that aggregates elements from each of the
     iterables. If the iterables are of uneven length, missing values are
     filled-in with fillvalue. Iteration continues until the longest
     iterable is exhausted.
 
+    If strict is True, the iterables must all have the same length: a
+    ValueError is raised as soon as one of them runs out before the others.
+
     :param args: the iterables to combine
     :param fillvalue: value to fill in those missing from shorter iterables
+    :param strict: raise ValueError if the lengths differ (default is False)
     """
     # zip_longest('ABCD', 'xy', fillvalue='-') --> Ax By C- D-
-    iterators: List[Iterator[Any]] = [iter(it) for it in args]
-    num_active = len(iterators)
-    if not num_active:
-        return
-    while True:
-        values = []
-        for i, it in enumerate(iterators):
+    values: List[Any] = [fillvalue] * len(args)
+    # Exhausted iterators are dropped, their slot in values keeps fillvalue.
+    active = [(i, iter(it)) for i, it in enumerate(args)]
+    while active:
+        exhausted = None
+        for i, it in active:
             try:
-                value = next(it)
+                values[i] = next(it)
             except StopIteration:
-                num_active -= 1
-                if not num_active:
-                    return
-                iterators[i] = repeat(fillvalue)
-                value = fillvalue
-            values.append(value)
+                values[i] = fillvalue
+                if exhausted is None:
+                    exhausted = []
+                exhausted.append(i)
+        if exhausted:
+            if len(exhausted) == len(active):
+                return
+            if strict:
+                raise ValueError("zip_longest() arguments have different lengths")
+            active = [(i, it) for i, it in active if i not in exhausted]
         yield tuple(values)
+        if len(active) == 1:
+            # Only one column still changes.
+            i, it = active[0]
+            for value in it:
+                values[i] = value
+                yield tuple(values)
+            return
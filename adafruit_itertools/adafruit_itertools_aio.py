@@ -0,0 +1,610 @@
+# SPDX-FileCopyrightText: 2001-2019 Python Software Foundation
+#
+# SPDX-License-Identifier: PSF-2.0
+
+"""
+`adafruit_itertools_aio`
+================================================================================
+
+Asynchronous counterparts of the itertools and extras building blocks, for
+pipelines fed by asynchronous iterators such as readings arriving from
+sockets or serial ports.
+
+Every function accepts asynchronous iterables as well as ordinary ones, and
+returns an asynchronous iterator to be consumed with ``async for``. Values
+are awaited one at a time from the source, so a pipeline never reads
+further ahead than it has to. An ordinary iterable is read without
+suspending, except for a pause every ``_SyncIterator.YIELD_EVERY`` values
+that lets other tasks run; a single slow ``next()`` still holds up the
+event loop.
+
+The iterators are implemented as classes rather than asynchronous
+generators, which CircuitPython does not support.
+
+* Author(s): The PSF and Dave Astels
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+* Adafruit's asyncio library: https://github.com/adafruit/Adafruit_CircuitPython_asyncio
+"""
+
+import asyncio
+
+try:
+    from typing import (
+        Any,
+        AsyncIterable,
+        AsyncIterator,
+        Callable,
+        Iterable,
+        List,
+        Optional,
+        Tuple,
+        TypeVar,
+        Union,
+    )
+
+    from typing_extensions import TypeAlias
+
+    _T = TypeVar("_T")
+    _AnyIterable: TypeAlias = Union[AsyncIterable[_T], Iterable[_T]]
+except ImportError:
+    pass
+
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Itertools.git"
+
+
+class _SyncIterator:
+    """Asynchronous iterator over an ordinary iterator, which gives the event
+    loop a turn every YIELD_EVERY values."""
+
+    YIELD_EVERY = 32
+
+    def __init__(self, iterable: Iterable[_T]):
+        self.it = iter(iterable)
+        self.count = 0
+
+    def __aiter__(self) -> "_SyncIterator":
+        return self
+
+    async def __anext__(self) -> _T:
+        self.count += 1
+        if self.count == self.YIELD_EVERY:
+            self.count = 0
+            await asyncio.sleep(0)
+        try:
+            return next(self.it)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def _aiter(iterable: "_AnyIterable[_T]") -> AsyncIterator[_T]:
+    if hasattr(iterable, "__aiter__"):
+        return iterable.__aiter__()
+    return _SyncIterator(iterable)  # type: ignore[arg-type, return-value]
+
+
+class accumulate:
+    """Make an asynchronous iterator that returns accumulated sums, or
+    accumulated results of other binary functions (specified via the
+    optional func argument).
+
+    :param iterable: the source of values to be accumulated
+    :param func: the function to combine the accumulated value with the next one
+    :param initial: if given, the accumulation starts with this value, which
+                    is also produced first
+
+    """
+
+    def __init__(
+        self,
+        iterable: "_AnyIterable[_T]",
+        func: Callable[[_T, _T], _T] = lambda x, y: x + y,  # type: ignore[operator]
+        *,
+        initial: Optional[_T] = None,
+    ):
+        self.it = _aiter(iterable)
+        self.func = func
+        self.started = initial is not None
+        self.acc: Any = initial
+        self.initial_pending = self.started
+
+    def __aiter__(self) -> "accumulate":
+        return self
+
+    async def __anext__(self) -> _T:
+        if self.initial_pending:
+            self.initial_pending = False
+            return self.acc
+        value = await self.it.__anext__()
+        if self.started:
+            self.acc = self.func(self.acc, value)
+        else:
+            self.acc = value
+            self.started = True
+        return self.acc
+
+
+class chain:
+    """Make an asynchronous iterator that returns elements from the first
+    iterable until it is exhausted, then proceeds to the next iterable, until
+    all of the iterables are exhausted.
+
+    :param p: a list of iterable from which to yield values
+
+    """
+
+    def __init__(self, *iterables: "_AnyIterable[_T]"):
+        self.iterables = list(iterables)
+        self.it: Optional[AsyncIterator[_T]] = None
+
+    def __aiter__(self) -> "chain":
+        return self
+
+    async def __anext__(self) -> _T:
+        while True:
+            if self.it is None:
+                if not self.iterables:
+                    raise StopAsyncIteration
+                self.it = _aiter(self.iterables.pop(0))
+            try:
+                return await self.it.__anext__()
+            except StopAsyncIteration:
+                self.it = None
+
+
+class dropwhile:
+    """Make an asynchronous iterator that drops elements from the iterable as
+    long as the predicate is true; afterwards, returns every element.
+
+    :param predicate: used to test each element until it returns False
+    :param iterable: source of values
+
+    """
+
+    def __init__(self, predicate: Callable[[_T], object], iterable: "_AnyIterable[_T]"):
+        self.predicate = predicate
+        self.it = _aiter(iterable)
+        self.dropping = True
+
+    def __aiter__(self) -> "dropwhile":
+        return self
+
+    async def __anext__(self) -> _T:
+        value = await self.it.__anext__()
+        while self.dropping:
+            if not self.predicate(value):
+                self.dropping = False
+                break
+            value = await self.it.__anext__()
+        return value
+
+
+class groupby:
+    """Make an asynchronous iterator that returns consecutive keys and groups
+    from the iterable, as itertools.groupby() does. Each group is itself an
+    asynchronous iterator sharing the underlying iterable, so it is no
+    longer usable once groupby() has been advanced.
+
+    :param iterable: the source of values
+    :param key: the key computation function (default is None)
+
+    """
+
+    def __init__(
+        self,
+        iterable: "_AnyIterable[_T]",
+        key: Optional[Callable[[_T], Any]] = None,
+    ):
+        self.keyfunc = key if key is not None else lambda x: x
+        self.it = _aiter(iterable)
+        # Sentinel values, not actually returned during iteration.
+        self.currvalue: Any = object()
+        self.tgtkey = self.currkey = self.currvalue
+        self.id: Optional[object] = None
+
+    def __aiter__(self) -> "groupby":
+        return self
+
+    async def __anext__(self) -> Tuple[Any, "_grouper"]:
+        self.id = object()
+        while self.currkey == self.tgtkey:
+            self.currvalue = await self.it.__anext__()  # Exit on StopAsyncIteration
+            self.currkey = self.keyfunc(self.currvalue)
+        self.tgtkey = self.currkey
+        return (self.currkey, _grouper(self, self.tgtkey, self.id))
+
+
+class _grouper:
+    def __init__(self, parent: groupby, tgtkey: Any, id: object):
+        self.parent = parent
+        self.tgtkey = tgtkey
+        self.id = id
+        self.started = False
+        self.done = False
+
+    def __aiter__(self) -> "_grouper":
+        return self
+
+    async def __anext__(self) -> Any:
+        parent = self.parent
+        if self.done or parent.id is not self.id:
+            raise StopAsyncIteration
+        if self.started:
+            try:
+                parent.currvalue = await parent.it.__anext__()
+            except StopAsyncIteration:
+                self.done = True
+                raise
+            parent.currkey = parent.keyfunc(parent.currvalue)
+        self.started = True
+        if parent.currkey != self.tgtkey:
+            self.done = True
+            raise StopAsyncIteration
+        return parent.currvalue
+
+
+class interleave_ready:
+    """Make an asynchronous iterator returning values from all the iterables
+    in the order they become available, each source being read by its own
+    task. Values from one source keep their order.
+
+    burst sets how many values a source may have waiting to be returned
+    before its task stops reading from it. With the default of 1, a source
+    that is always ready cannot get more than one value ahead of the others,
+    so every ready source gets its turn. Larger values favour throughput
+    from fast sources.
+
+    If a source raises an exception, it is raised by this iterator and the
+    remaining tasks are cancelled. Call aclose() to stop the tasks when
+    giving up on the iterator before it is exhausted.
+
+    :param iterables: the asynchronous iterables to merge
+    :param burst: how many values each source may have waiting (default is 1)
+
+    """
+
+    def __init__(self, *iterables: "_AnyIterable[_T]", burst: int = 1):
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.its = [_aiter(iterable) for iterable in iterables]
+        self.burst = burst
+        self.waiting = [0] * len(self.its)  # values waiting, per source
+        self.ready: List[Any] = []  # (source, value, error), oldest at self.first
+        self.first = 0
+        self.live = len(self.its)
+        # The events are made with the tasks, in the running loop, as in tee().
+        self.arrived: Any = None
+        self.taken: List[Any] = []
+        self.tasks: Optional[List[Any]] = None
+        self.closed = False
+
+    def __aiter__(self) -> "interleave_ready":
+        return self
+
+    async def _pump(self, k: int) -> None:
+        it = self.its[k]
+        try:
+            while True:
+                while self.waiting[k] >= self.burst:
+                    self.taken[k].clear()
+                    await self.taken[k].wait()
+                value = await it.__anext__()
+                self.waiting[k] += 1
+                self.ready.append((k, value, None))
+                self.arrived.set()
+        except StopAsyncIteration:
+            pass
+        except Exception as error:
+            self.ready.append((k, None, error))
+        finally:
+            # Once closed, the count no longer matters: __anext__ stops first.
+            if not self.closed:
+                self.live -= 1
+                self.arrived.set()
+
+    async def __anext__(self) -> _T:
+        if self.closed:
+            raise StopAsyncIteration
+        if self.tasks is None:
+            self.arrived = asyncio.Event()
+            self.taken = [asyncio.Event() for _ in self.its]
+            self.tasks = [asyncio.create_task(self._pump(k)) for k in range(len(self.its))]
+        while self.first == len(self.ready):
+            if not self.live:
+                raise StopAsyncIteration
+            self.arrived.clear()
+            await self.arrived.wait()
+        k, value, error = self.ready[self.first]
+        self.first += 1
+        if self.first > len(self.ready) // 2:
+            # Drop what has been returned, amortized over the reads.
+            del self.ready[: self.first]
+            self.first = 0
+        if error is not None:
+            await self.aclose()
+            raise error
+        self.waiting[k] -= 1
+        self.taken[k].set()
+        return value
+
+    async def aclose(self) -> None:
+        """Cancel the tasks reading from the sources."""
+        self.closed = True
+        for task in self.tasks or ():
+            task.cancel()
+        self.tasks = []
+        self.live = 0
+        self.ready = []
+        self.first = 0
+
+
+class islice:
+    """Make an asynchronous iterator that returns selected elements from the
+    iterable, as itertools.islice() does. start, stop and step must not be
+    negative.
+
+    :param p: the iterator items come from
+    :param start: the index of the first item
+    :param stop: the index one past the final item, None (the default) means
+                 no end
+    :param step: how far to move to subsequent items (default is 1)
+
+    """
+
+    def __init__(
+        self,
+        p: "_AnyIterable[_T]",
+        start: int,
+        stop: Optional[int] = (),  # type: ignore[assignment]
+        step: int = 1,
+    ):
+        if stop == ():
+            stop = start
+            start = 0
+        if stop is not None and stop < 0:
+            raise ValueError("stop must be None or >= 0")
+        if start < 0:
+            raise ValueError("start must be >= 0")
+        if step <= 0:
+            raise ValueError("step must be > 0")
+        self.it = _aiter(p)
+        self.position = 0  # index of the next item read from the source
+        self.next = start  # index of the next item to return
+        self.stop = stop
+        self.step = step
+
+    def __aiter__(self) -> "islice":
+        return self
+
+    async def __anext__(self) -> _T:
+        if self.stop is not None and self.next >= self.stop:
+            raise StopAsyncIteration
+        while self.position < self.next:
+            await self.it.__anext__()
+            self.position += 1
+        value = await self.it.__anext__()
+        self.position += 1
+        self.next += self.step
+        return value
+
+
+class roundrobin:
+    """Make an asynchronous iterator picking a value from each iterable in
+    turn, skipping those that are exhausted.
+
+    :param iterables: the iterables to pick from
+
+    """
+
+    def __init__(self, *iterables: "_AnyIterable[_T]"):
+        self.its = [_aiter(iterable) for iterable in iterables]
+        self.i = 0
+
+    def __aiter__(self) -> "roundrobin":
+        return self
+
+    async def __anext__(self) -> _T:
+        while self.its:
+            if self.i >= len(self.its):
+                self.i = 0
+            try:
+                value = await self.its[self.i].__anext__()
+            except StopAsyncIteration:
+                del self.its[self.i]
+                continue
+            self.i += 1
+            return value
+        raise StopAsyncIteration
+
+
+class takewhile:
+    """Make an asynchronous iterator that returns elements from the iterable
+    as long as the predicate is true.
+
+    :param predicate: used to test values
+    :param iterable: source of values
+
+    """
+
+    def __init__(self, predicate: Callable[[_T], object], iterable: "_AnyIterable[_T]"):
+        self.predicate = predicate
+        self.it = _aiter(iterable)
+        self.done = False
+
+    def __aiter__(self) -> "takewhile":
+        return self
+
+    async def __anext__(self) -> _T:
+        if self.done:
+            raise StopAsyncIteration
+        value = await self.it.__anext__()
+        if not self.predicate(value):
+            self.done = True
+            raise StopAsyncIteration
+        return value
+
+
+class _TeeBuffer:
+    """Items shared by the iterators returned from tee(), from the slowest
+    to the fastest consumer."""
+
+    def __init__(self, iterable: "_AnyIterable[_T]", n: int, maxlag: Optional[int]):
+        self.it = _aiter(iterable)
+        self.items: List[Any] = []
+        self.base = 0  # position of items[0]
+        self.head = 0  # position of the oldest item still needed
+        self.cursors = [0] * n
+        self.maxlag = maxlag
+        # Made on first use: before Python 3.10 they bind to the event loop
+        # current when created, which asyncio.run() then replaces.
+        self.lock: Any = None
+        self.released: Any = None
+
+    async def fetch(self, k: int) -> Any:
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+            self.released = asyncio.Event()
+        pos = self.cursors[k]
+        if pos == self.base + len(self.items):
+            async with self.lock:
+                # Another consumer may have read the item while we waited.
+                if pos == self.base + len(self.items):
+                    while self.maxlag is not None and pos - self.head >= self.maxlag:
+                        self.released.clear()
+                        await self.released.wait()
+                    self.items.append(await self.it.__anext__())
+        value = self.items[pos - self.base]
+        self.cursors[k] = pos + 1
+        if pos == self.head:
+            self.head = min(self.cursors)
+            if self.head - self.base > len(self.items) // 2:
+                # Drop what every consumer has read, amortized over the reads.
+                del self.items[: self.head - self.base]
+                self.base = self.head
+            self.released.set()
+        return value
+
+
+class _tee:
+    """One of the independent asynchronous iterators returned by tee()."""
+
+    def __init__(self, buffer: _TeeBuffer, k: int):
+        self.buffer = buffer
+        self.k = k
+
+    def __aiter__(self) -> "_tee":
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self.buffer.fetch(self.k)
+
+    def buffered(self) -> int:
+        """Return the number of items held for the slower iterators."""
+        return self.buffer.base + len(self.buffer.items) - self.buffer.head
+
+
+def tee(iterable: "_AnyIterable[_T]", n: int = 2, maxlag: Optional[int] = None) -> List[_tee]:
+    """Return n independent asynchronous iterators from a single iterable.
+
+    The iterators share a buffer holding the items the slowest one has not
+    read yet. With maxlag set, an iterator that gets maxlag items ahead of
+    the slowest one waits for it to catch up instead of reading more from
+    the source, which bounds the buffer. The iterators must then be consumed
+    by concurrent tasks.
+
+    :param iterable: the iterator from which to make iterators.
+    :param n: the number of iterators to make (default is 2)
+    :param maxlag: how far ahead of the slowest iterator the fastest one may
+                   get, None (the default) means no limit
+
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if maxlag is not None and maxlag < 1:
+        raise ValueError("maxlag must be None or >= 1")
+    buffer = _TeeBuffer(iterable, n, maxlag)
+    return [_tee(buffer, k) for k in range(n)]
+
+
+class zip_longest:
+    """Make an asynchronous iterator that aggregates elements from each of
+    the iterables. If the iterables are of uneven length, missing values are
+    filled-in with fillvalue. Iteration continues until the longest iterable
+    is exhausted.
+
+    :param args: the iterables to combine
+    :param fillvalue: value to fill in those missing from shorter iterables
+    """
+
+    def __init__(self, *args: "_AnyIterable[Any]", fillvalue: Any = None):
+        self.fillvalue = fillvalue
+        self.active = [(i, _aiter(arg)) for i, arg in enumerate(args)]
+        self.values = [fillvalue] * len(args)
+
+    def __aiter__(self) -> "zip_longest":
+        return self
+
+    async def __anext__(self) -> Tuple[Any, ...]:
+        if not self.active:
+            raise StopAsyncIteration
+        exhausted = []
+        for i, it in self.active:
+            try:
+                self.values[i] = await it.__anext__()
+            except StopAsyncIteration:
+                self.values[i] = self.fillvalue
+                exhausted.append(i)
+        if exhausted:
+            self.active = [(i, it) for i, it in self.active if i not in exhausted]
+            if not self.active:
+                raise StopAsyncIteration
+        return tuple(self.values)
+
+
+async def tail(n: int, iterable: "_AnyIterable[_T]") -> List[_T]:
+    """Return a list of the last n items of the iterable.
+
+    :param n: how many values to return
+    :param iterable: the source of values
+
+    """
+    if n <= 0:
+        return []
+    buf: List[_T] = []
+    oldest = 0
+    async for value in _aiter(iterable):
+        if len(buf) < n:
+            buf.append(value)
+        else:
+            buf[oldest] = value
+            oldest += 1
+            if oldest == n:
+                oldest = 0
+    return buf[oldest:] + buf[:oldest]
+
+
+async def take(n: int, iterable: "_AnyIterable[_T]") -> List[_T]:
+    """Return a list of the first n items of the iterable.
+
+    :param n: how many values to take
+    :param iterable: the source of values
+
+    """
+    result: List[_T] = []
+    if n <= 0:
+        return result
+    async for value in _aiter(iterable):
+        result.append(value)
+        if len(result) == n:
+            break
+    return result
@@ -0,0 +1,386 @@
+# SPDX-FileCopyrightText: 2001-2019 Python Software Foundation
+#
+# SPDX-License-Identifier: PSF-2.0
+
+"""
+`adafruit_itertools_cpython`
+================================================================================
+
+Helpers built on the itertools building blocks that need modules only
+CPython provides, such as multiprocessing, threading or tempfile.
+
+They are kept out of ``adafruit_itertools_extras`` so that importing the
+extras on a microcontroller does not load code that cannot run there.
+
+* Author(s): The PSF and Dave Astels
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* Adafruit's CircuitPython port of itertools
+* CPython; none of these helpers run on CircuitPython
+"""
+
+import adafruit_itertools as it
+
+try:
+    from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+    _T = TypeVar("_T")
+except ImportError:
+    pass
+
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Itertools.git"
+
+
+_MISSING = object()
+
+
+def _call_shard(
+    func: Callable[[Iterator[Any]], _T],
+    generator: Callable[..., Iterator[Any]],
+    args: Tuple[Any, ...],
+    shard: Tuple[int, int],
+) -> _T:
+    return func(generator(*args, shard=shard))
+
+
+def map_shards(
+    func: Callable[[Iterator[Any]], _T],
+    generator: Callable[..., Iterator[Any]],
+    *args: Any,
+    shards: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> List[_T]:
+    """Split the output of ``generator(*args)`` into shards and call func on
+    each of them in a pool of worker processes. Returns the results in shard
+    order, so they combine the same way as func applied to the whole output.
+
+    The generator is one of the functions accepting a shard argument, such as
+    combinations(), permutations() or product(). func and generator must be
+    picklable, so they need to be defined at module level.
+
+    This requires the multiprocessing module, available in CPython but not
+    in CircuitPython.
+
+    Example:
+        map_shards(sum_of_best, combinations, range(40), 5)
+
+    :param func: the function called with the iterator over one shard
+    :param generator: produces the values to process
+    :param args: the arguments passed to generator
+    :param shards: how many shards to split into. Defaults to the number of
+                   processes
+    :param processes: the number of worker processes. Defaults to the number
+                      of CPUs
+
+    """
+    from multiprocessing import Pool, cpu_count
+
+    if shards is None:
+        shards = processes or cpu_count()
+    with Pool(processes) as pool:
+        return pool.starmap(
+            _call_shard, [(func, generator, args, (k, shards)) for k in range(shards)]
+        )
+
+
+def parallel_starmap(
+    function: Callable[..., _T],
+    iterable: Iterable[Iterable[Any]],
+    executor: str = "thread",
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    prefetch: Optional[int] = None,
+) -> Iterator[_T]:
+    """Compute ``function(*args)`` for each args in the iterable, like
+    starmap(), but run the calls in a pool of threads or processes.
+
+    The iterable is read lazily and at most prefetch calls are in flight at
+    any time, so memory stays bounded even for infinite inputs. Results come
+    out in input order, or as soon as each finishes when ordered is False.
+    An exception raised by a call is raised here as soon as it is seen,
+    without waiting for earlier calls. When the returned iterator is
+    abandoned or closed, calls not yet started are cancelled.
+
+    "thread" suits functions that wait on I/O, "process" CPU-bound functions,
+    which must then be picklable. This requires the concurrent.futures
+    module, available in CPython but not in CircuitPython.
+
+    :param function: the function to apply
+    :param iterable: where groups of arguments come from
+    :param executor: "thread" (the default) or "process"
+    :param workers: the number of threads or processes. Defaults to the
+                    number of CPUs
+    :param ordered: return results in input order (default is True)
+    :param prefetch: the most calls in flight at once. Defaults to twice
+                     the number of workers
+
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from os import cpu_count
+
+    executors = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if executor not in executors:
+        raise ValueError('executor must be "thread" or "process"')
+    if workers is None:
+        workers = cpu_count() or 1
+    if prefetch is None:
+        prefetch = 2 * workers
+    if workers < 1 or prefetch < 1:
+        raise ValueError("workers and prefetch must be >= 1")
+    pool = executors[executor](workers)
+    return _parallel_starmap(pool, function, iter(iterable), ordered, prefetch)
+
+
+def _parallel_starmap(
+    pool: Any,
+    function: Callable[..., _T],
+    args: Iterator[Iterable[Any]],
+    ordered: bool,
+    prefetch: int,
+) -> Iterator[_T]:
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending: Any = deque((), prefetch)  # in input order
+    try:
+        for arg in it.islice(args, prefetch):
+            pending.append(pool.submit(function, *arg))
+        while pending:
+            unfinished = [future for future in pending if not future.done()]
+            if len(unfinished) == len(pending) or (ordered and not pending[0].done()):
+                wait(unfinished, return_when=FIRST_COMPLETED)
+            for future in pending:
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+            if ordered:
+                ready = []
+                while pending and pending[0].done():
+                    ready.append(pending.popleft())
+            else:
+                ready = [future for future in pending if future.done()]
+                for future in ready:
+                    pending.remove(future)
+            # Keep the pool busy while the consumer handles the results.
+            for arg in it.islice(args, len(ready)):
+                pending.append(pool.submit(function, *arg))
+            for future in ready:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def prefetch(iterable: Iterable[_T], depth: int = 1) -> Iterator[_T]:
+    """Read the iterable on a background thread, up to depth values ahead of
+    the consumer, so a slow producer and a slow consumer run at the same
+    time instead of taking turns.
+
+    The thread starts when the first value is requested. An exception raised
+    by the iterable is raised here, after the values read before it. Once
+    the returned iterator is closed or abandoned, the thread stops as soon
+    as its current read from the iterable returns.
+
+    This requires the threading module, available in CPython but not in
+    CircuitPython.
+
+    :param iterable: the source of values
+    :param depth: how many values may be read ahead (default is 1)
+
+    """
+    if depth < 1:
+        raise ValueError("depth must be >= 1")
+    return _prefetch(iter(iterable), depth)
+
+
+def _prefetch(iterator: Iterator[_T], depth: int) -> Iterator[_T]:
+    from queue import Full, Queue
+    from threading import Event, Thread
+
+    items: Any = Queue(depth)
+    stop = Event()
+
+    def put(item: Tuple[bool, Any]) -> bool:
+        # Wake up regularly to notice when the consumer has gone away.
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.05)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for value in iterator:
+                if not put((True, value)):
+                    return
+            put((False, None))
+        except Exception as error:
+            put((False, error))
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            is_value, value = items.get()
+            if is_value:
+                yield value
+            elif value is None:
+                return
+            else:
+                raise value
+    finally:
+        stop.set()
+
+
+def sorted_external(
+    iterable: Iterable[_T],
+    key: Optional[Callable[[_T], Any]] = None,
+    chunk_size: int = 100000,
+    tmpdir: Optional[str] = None,
+    serializer: Any = None,
+) -> Iterator[_T]:
+    """Return the values of the iterable in sorted order, like sorted(),
+    holding only about chunk_size of them in memory at a time. This makes
+    it possible to use groupby() on data that does not fit in memory.
+
+    The values are read chunk_size at a time, and each chunk is sorted and
+    written to a temporary file. The sorted files are then merged as the
+    values are requested. Values with equal keys keep their original order.
+
+    This requires the tempfile and heapq modules, available in CPython but
+    not in CircuitPython.
+
+    :param iterable: source of values
+    :param key: a function computing the sort key of each value
+    :param chunk_size: how many values to sort in memory at a time
+    :param tmpdir: the directory for the temporary files (default is the
+                   system's)
+    :param serializer: how values are written to the files: an object with
+                       dump(values, file) and load(file) functions, load
+                       returning a list of values or raising EOFError when
+                       none are left. Defaults to the pickle module; use a
+                       StructSerializer for numeric records.
+
+    """
+    # groupby(sorted_external(records, key), key) groups all equal keys
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least one")
+    if serializer is None:
+        import pickle
+
+        serializer = pickle
+    return _sorted_external(iter(iterable), key, chunk_size, tmpdir, serializer)
+
+
+# How many values go into each dump() while writing a sorted run.
+_SPILL_BLOCK = 1024
+
+
+def _sorted_external(
+    iterator: Iterator[_T],
+    key: Optional[Callable[[_T], Any]],
+    chunk_size: int,
+    tmpdir: Optional[str],
+    serializer: Any,
+) -> Iterator[_T]:
+    from heapq import heapify, heappop, heapreplace
+    from tempfile import TemporaryFile
+
+    files = []
+    try:
+        runs: List[Iterator[_T]] = []
+        chunk = list(it.islice(iterator, chunk_size))
+        while True:
+            chunk.sort(key=key)
+            following = next(iterator, _MISSING)
+            if following is _MISSING:
+                break
+            file = TemporaryFile(dir=tmpdir)
+            files.append(file)
+            for i in range(0, len(chunk), _SPILL_BLOCK):
+                serializer.dump(chunk[i : i + _SPILL_BLOCK], file)
+            file.seek(0)
+            runs.append(_read_run(file, serializer))
+            chunk = [following]  # type: ignore[list-item]
+            chunk.extend(it.islice(iterator, chunk_size - 1))
+        # The last chunk stays in memory as the last run.
+        runs.append(iter(chunk))
+        del chunk
+
+        # Entries are (key, run index, value, run): the run index breaks
+        # ties, so that equal keys come out in their original order.
+        heap = []
+        for index, run in enumerate(runs):
+            value = next(run, _MISSING)
+            if value is _MISSING:  # only when the iterable is empty
+                continue
+            heap.append((value if key is None else key(value), index, value, run))
+        heapify(heap)
+        while len(heap) > 1:
+            _, index, value, run = heap[0]
+            yield value
+            value = next(run, _MISSING)
+            if value is _MISSING:
+                heappop(heap)
+            else:
+                heapreplace(heap, (value if key is None else key(value), index, value, run))
+        if heap:
+            _, _, value, run = heap[0]
+            yield value
+            yield from run
+    finally:
+        for file in files:
+            file.close()
+
+
+def _read_run(file: Any, serializer: Any) -> Iterator[Any]:
+    try:
+        while True:
+            yield from serializer.load(file)
+    except EOFError:
+        return
+
+
+class StructSerializer:
+    """Write and read values for sorted_external() in a fixed binary layout,
+    which takes less space than pickle for numeric records. Each value is
+    a tuple with one item per field of the format, or a plain number if
+    the format has only one field.
+
+    This requires struct.Struct, available in CPython but not in CircuitPython.
+
+    :param fmt: the struct format of one value, for example "<qd"
+
+    """
+
+    def __init__(self, fmt: str) -> None:
+        from struct import Struct
+
+        self.struct = Struct(fmt)
+        self.single = len(self.struct.unpack(bytes(self.struct.size))) == 1
+
+    def dump(self, values: List[Any], file: Any) -> None:
+        """Write the values to a binary file."""
+        pack = self.struct.pack
+        if self.single:
+            file.write(b"".join([pack(value) for value in values]))
+        else:
+            file.write(b"".join([pack(*value) for value in values]))
+
+    def load(self, file: Any) -> List[Any]:
+        """Read some of the values from a binary file, raising EOFError when
+        none are left."""
+        data = file.read(self.struct.size * _SPILL_BLOCK)
+        if not data:
+            raise EOFError
+        values = self.struct.iter_unpack(data)
+        if self.single:
+            return [value for (value,) in values]
+        return list(values)
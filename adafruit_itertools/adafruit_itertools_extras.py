@@ -65,6 +65,86 @@ except ImportError:
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Itertools.git"
 
+# Stands for a value that is not there, where None could be a value.
+_MISSING = object()
+
+
+def aggregate_by(
+    iterable: Iterable[_T],
+    key: Optional[Callable[[_T], Any]] = None,
+    reducer: Union[str, Callable[[Any, Any], Any]] = "count",
+    value: Optional[Callable[[_T], Any]] = None,
+    max_keys: Optional[int] = None,
+) -> Iterator[Tuple[Any, Any]]:
+    """Group the elements of the iterable by key, in a single pass and
+    whatever their order, and reduce each group to one aggregate. Unlike
+    groupby(), the input does not need to be sorted, and memory grows with
+    the number of distinct keys rather than the number of elements. The
+    (key, aggregate) pairs are produced once the iterable is exhausted.
+
+    :param iterable: source of values
+    :param key: a function computing the key of each element; defaults to
+                the element itself
+    :param reducer: "count", "sum", "min", "max", or a function of two
+                    arguments combining the aggregate so far with the next
+                    value, the first value of a group being its first
+                    aggregate (default is "count")
+    :param value: a function computing the value to aggregate from each
+                  element; defaults to the element itself
+    :param max_keys: if given, when a new key would make more than max_keys
+                     groups, the aggregates so far are produced and the
+                     groups start empty again. A key can then appear in
+                     several pairs, whose partial aggregates the caller
+                     combines.
+
+    """
+    # aggregate_by('ABAACB') --> ('A', 3) ('B', 2) ('C', 1)
+    # aggregate_by([1, 5, 2, 8], lambda x: x % 2, 'sum') --> (1, 6) (0, 10)
+    if callable(reducer):
+        first, fold = _identity, reducer
+    elif reducer in _REDUCERS:
+        first, fold = _REDUCERS[reducer]
+    else:
+        raise ValueError("reducer must be 'count', 'sum', 'min', 'max' or a function")
+    if max_keys is not None and max_keys < 1:
+        raise ValueError("max_keys must be at least one")
+    return _aggregate_by(iter(iterable), key, first, fold, value, max_keys)
+
+
+def _identity(x: _T) -> _T:
+    return x
+
+
+# How each named reducer starts a group and adds a value to it.
+_REDUCERS = {
+    "count": (lambda _: 1, lambda total, _: total + 1),
+    "sum": (_identity, it._add),
+    "min": (_identity, lambda least, x: x if x < least else least),
+    "max": (_identity, lambda most, x: x if x > most else most),
+}
+
+
+def _aggregate_by(
+    iterator: Iterator[_T],
+    key: Optional[Callable[[_T], Any]],
+    first: Callable[[Any], Any],
+    fold: Callable[[Any, Any], Any],
+    value: Optional[Callable[[_T], Any]],
+    max_keys: Optional[int],
+) -> Iterator[Tuple[Any, Any]]:
+    groups: dict = {}
+    for element in iterator:
+        k = element if key is None else key(element)
+        v = element if value is None else value(element)
+        if k in groups:
+            groups[k] = fold(groups[k], v)
+        else:
+            if max_keys is not None and len(groups) == max_keys:
+                yield from groups.items()
+                groups = {}
+            groups[k] = first(v)
+    yield from groups.items()
+
 
 def all_equal(iterable: Iterable[Any]) -> bool:
     """Returns True if all the elements are equal to each other.
@@ -72,6 +152,15 @@ def all_equal(iterable: Iterable[Any]) -> bool:
     :param iterable: source of values
 
     """
+    if isinstance(iterable, (bytes, bytearray)):
+        try:
+            return not iterable or iterable.count(iterable[:1]) == len(iterable)
+        except (AttributeError, TypeError):  # CircuitPython bytearray has no count
+            pass
+    view = _numeric_view(iterable)
+    if view is not None:
+        # Every element equals the next one, compared without copying.
+        return view[1:] == view[:-1]
     g = it.groupby(iterable)
     try:
         next(g)  # value isn't relevant
@@ -87,17 +176,197 @@ def all_equal(iterable: Iterable[Any]) -> bool:
         return True
 
 
+# The struct formats a memoryview can compare and convert to numbers.
+_NUMERIC_FORMATS = frozenset("?bBhHiIlLqQnNefd")
+
+
+def _numeric_view(iterable: Any) -> Optional[memoryview]:
+    """A one-dimensional memoryview of iterable if it supports the buffer
+    protocol with a numeric format, else None."""
+    if isinstance(iterable, (str, list, tuple, range)):
+        return None
+    try:
+        view = memoryview(iterable)
+        if view.ndim != 1 or view.format not in _NUMERIC_FORMATS:
+            return None
+    except (AttributeError, TypeError):  # CircuitPython has no view.format
+        return None
+    return view
+
+
+def batched(
+    iterable: Iterable[_T], n: int, into: Optional[Any] = None
+) -> Iterator[Union[Tuple[_T, ...], memoryview]]:
+    """Collect data into tuples of length n, the last one being shorter if
+    the length of iterable is not a multiple of n. Unlike grouper(), no
+    padding is added.
+
+    When into is given, it must be a writable object supporting the buffer
+    protocol, such as a bytearray or array.array, with room for n values.
+    Each batch is then written into it and a memoryview of the filled part
+    is produced instead of a tuple, so numeric values are not boxed one by
+    one. The same memory is reused for every batch: a view is only valid
+    until the next batch is requested.
+
+    :param iterable: source of values
+    :param n: batch size
+    :param into: optional buffer to fill with each batch
+
+    """
+    # batched('ABCDEFG', 3) --> ('A', 'B', 'C') ('D', 'E', 'F') ('G',)
+    if n < 1:
+        raise ValueError("n must be at least one")
+    if into is None:
+        return _batched(iter(iterable), n)
+    view = memoryview(into)
+    if len(view) < n:
+        raise ValueError("into is too small for batches of n")
+    return _batched_into(iter(iterable), n, into, view)
+
+
+def _batched(iterator: Iterator[_T], n: int) -> Iterator[Tuple[_T, ...]]:
+    while True:
+        batch = tuple(it.islice(iterator, n))
+        if not batch:
+            return
+        yield batch
+
+
+def _batched_into(
+    iterator: Iterator[_T], n: int, into: Any, view: memoryview
+) -> Iterator[memoryview]:
+    k = 0
+    for value in iterator:
+        into[k] = value
+        k += 1
+        if k == n:
+            yield view[:n]
+            k = 0
+    if k:
+        yield view[:k]
+
+
+def chunked(iterable: Iterable[_T], n: int) -> Iterator[Union[List[_T], memoryview]]:
+    """Break the iterable into lists of length n, the last one being shorter
+    if the length of iterable is not a multiple of n.
+
+    Objects supporting the buffer protocol, such as bytes, bytearray or
+    array.array, are instead split into memoryview slices sharing the
+    original memory, without copying any element.
+
+    :param iterable: source of values
+    :param n: chunk size
+
+    """
+    # chunked('ABCDEFG', 3) --> ['A', 'B', 'C'] ['D', 'E', 'F'] ['G']
+    if n < 1:
+        raise ValueError("n must be at least one")
+    try:
+        view = memoryview(iterable)  # type: ignore[arg-type]
+    except TypeError:
+        return _chunked(iter(iterable), n)
+    return (view[i : i + n] for i in range(0, len(view), n))
+
+
+def _chunked(iterator: Iterator[_T], n: int) -> Iterator[List[_T]]:
+    while True:
+        chunk = list(it.islice(iterator, n))
+        if not chunk:
+            return
+        yield chunk
+
+
+def combination_count(n: int, r: int) -> int:
+    """Return the number of tuples combinations() produces for r items taken
+    from a pool of n.
+
+    :param n: the size of the pool
+    :param r: the length of each combination
+
+    """
+    # combination_count(4, 2) -> 6
+    return it._comb(n, r)
+
+
+def combination_index(element: Iterable[_T], iterable: Iterable[_T]) -> int:
+    """Return the position of *element* in the output of
+    combinations(iterable, len(element)), without generating the earlier
+    combinations. Raises ValueError if element is not a combination of
+    iterable.
+
+    :param element: the combination to find
+    :param iterable: the source of values the combination was taken from
+
+    """
+    # combination_index('ce', 'abcde') -> 8
+    pool = tuple(iterable)
+    n = len(pool)
+    positions = []
+    j = 0
+    for x in element:
+        while j < n and pool[j] != x:
+            j += 1
+        if j == n:
+            raise ValueError("element is not a combination of iterable")
+        positions.append(j)
+        j += 1
+    r = len(positions)
+    # Count the combinations that sort after this one and subtract.
+    index = it._comb(n, r) - 1
+    for i, p in enumerate(positions):
+        index -= it._comb(n - 1 - p, r - i)
+    return index
+
+
 def dotproduct(vec1: Iterable[_N], vec2: Iterable[_N]) -> _N:
     """Compute the dot product of two vectors.
 
+    When NumPy is available and both vectors are arrays of floats, NumPy
+    computes the product. It may add the terms in a different order, so the
+    last digits of the result can differ.
+
     :param vec1: the first vector
     :param vec2: the second vector
 
     """
     # dotproduct([1, 2, 3], [1, 2, 3]) -> 14
+    a = it._as_ndarray(vec1)
+    b = it._as_ndarray(vec2)
+    if a is not None and b is not None and a.dtype.kind == b.dtype.kind == "f":
+        n = min(len(a), len(b))
+        result = it._np.dot(a[:n], b[:n])
+        if isinstance(vec1, it._np.ndarray) or isinstance(vec2, it._np.ndarray):
+            return result
+        return float(result)
     return sum(map(lambda x, y: x * y, vec1, vec2))
 
 
+def ewma(iterable: Iterable[float], alpha: float) -> Iterator[float]:
+    """Return the exponentially weighted moving average of the values: the
+    first value, then each time the previous average moved towards the new
+    value by a fraction alpha of the difference.
+
+    :param iterable: source of numbers
+    :param alpha: the weight of each new value, between 0 (excluded) and 1
+
+    """
+    # ewma([0, 4, 8], 0.5) --> 0 2.0 5.0
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    return _ewma(iter(iterable), alpha)
+
+
+def _ewma(iterator: Iterator[float], alpha: float) -> Iterator[float]:
+    try:
+        average = next(iterator)
+    except StopIteration:
+        return
+    yield average
+    for value in iterator:
+        average += alpha * (value - average)
+        yield average
+
+
 def first_true(
     iterable: Iterable[_T],
     default: Union[bool, _T] = False,
@@ -108,7 +377,8 @@ def first_true(
     If no true value is found, returns *default*
 
     If *pred* is not None, returns the first item for which pred(item)
-    is true.
+    is true. Otherwise bytes, bytearray and numeric arrays are searched a
+    block at a time rather than item by item.
 
     :param iterable: source of values
     :param default: the value to return if no true value is found (default is
@@ -119,12 +389,31 @@ def first_true(
     """
     # first_true([a,b,c], x) --> a or b or c or x
     # first_true([a,b], x, f) --> a if f(a) else b if f(b) else x
+    view = _numeric_view(iterable) if pred is None else None
+    if view is not None:
+        return _first_true_view(view, default)
     try:
         return next(filter(pred, iterable))
     except StopIteration:
         return default
 
 
+def _first_true_view(view: memoryview, default: Any) -> Any:
+    # Skip runs of zeros a bounded block at a time, so memory use does not
+    # grow with the input and an early true value is found at once.
+    for start in range(0, len(view), 4096):
+        block = view[start : start + 4096]
+        if block.itemsize == 1:
+            data = block.tobytes()
+            if data.count(0) < len(data):
+                return block[len(data) - len(data.lstrip(b"\0"))]
+        else:
+            values = block.tolist()
+            if values.count(0) < len(values):
+                return next(filter(None, values))
+    return default
+
+
 def flatten(iterable_of_iterables: Iterable[Iterable[_T]]) -> Iterator[_T]:
     """Flatten one level of nesting.
 
@@ -176,14 +465,101 @@ def iter_except(func: Callable[[], _T], exception: Type[BaseException]) -> Itera
         pass
 
 
-def ncycles(iterable: Iterable[_T], n: int) -> Iterator[_T]:
+def merge(
+    *iterables: Iterable[_T],
+    key: Optional[Callable[[_T], Any]] = None,
+    reverse: bool = False,
+) -> Iterator[_T]:
+    """Merge sorted iterables into a single sorted iterator, reading each
+    one lazily. Values with equal keys come out in the order of the
+    iterables that hold them, so the merge is stable.
+
+    The iterables compete in a tournament (loser) tree, so each value costs
+    O(log k) comparisons for k iterables. Once a single iterable is left,
+    its remaining values are passed through directly.
+
+    :param iterables: the sorted sources of values
+    :param key: a function computing the key the iterables are sorted by
+    :param reverse: whether the iterables are sorted in descending order
+
+    """
+    # merge([1, 3, 5], [2, 4], [0, 6]) --> 0 1 2 3 4 5 6
+    return _merge([iter(iterable) for iterable in iterables], key, reverse)
+
+
+def _merge(
+    iterators: List[Iterator[_T]],
+    key: Optional[Callable[[_T], Any]],
+    reverse: bool,
+) -> Iterator[_T]:
+    sources = []
+    values: List[Any] = []
+    keys: List[Any] = []
+    for iterator in iterators:
+        value = next(iterator, _MISSING)
+        if value is not _MISSING:
+            sources.append(iterator)
+            values.append(value)
+            keys.append(value if key is None else key(value))
+    k = len(sources)
+    if k == 0:
+        return
+
+    def first(a: int, b: int) -> int:
+        """Which of sources a and b comes first, the earlier winning ties."""
+        ka, kb = (keys[b], keys[a]) if reverse else (keys[a], keys[b])
+        return b if kb < ka or (b < a and not ka < kb) else a
+
+    # Node i has children 2i and 2i + 1; the leaves k..2k-1 are the sources.
+    # Each inner node holds the loser of the match played there.
+    winners = [0] * k + list(range(k))
+    tree = [0] * k
+    for node in range(k - 1, 0, -1):
+        a, b = winners[2 * node], winners[2 * node + 1]
+        winners[node] = first(a, b)
+        tree[node] = a + b - winners[node]
+    winner = winners[1]
+    del winners
+
+    live = k
+    while live > 1:
+        yield values[winner]
+        value = next(sources[winner], _MISSING)
+        if value is _MISSING:
+            # An exhausted source loses every match from now on.
+            live -= 1
+            values[winner] = kw = keys[winner] = _MISSING
+        else:
+            values[winner] = value
+            kw = keys[winner] = value if key is None else key(value)
+        # Replay the matches on the path from the winner's leaf to the root.
+        node = (k + winner) >> 1
+        while node:
+            challenger = tree[node]
+            kc = keys[challenger]
+            if kc is not _MISSING and (
+                kw is _MISSING
+                or (kw < kc if reverse else kc < kw)
+                or (challenger < winner and not (kc < kw if reverse else kw < kc))
+            ):
+                tree[node] = winner
+                winner = challenger
+                kw = kc
+            node >>= 1
+    yield values[winner]
+    yield from sources[winner]
+
+
+def ncycles(iterable: Iterable[_T], n: int, compact: bool = False) -> Iterator[_T]:
     """Returns the sequence elements a number of times.
 
     :param iterable: the source of values
     :param n: how many time to repeal the values
+    :param compact: if True, save the values as cycle() does with compact
 
     """
-    return it.chain_from_iterable(it.repeat(tuple(iterable), n))
+    saved = it._Cache(iterable) if compact else tuple(iterable)
+    return it.chain_from_iterable(it.repeat(saved, n))
 
 
 def nth(iterable: Iterable[_T], n: int, default: Optional[_T] = None) -> Optional[_T]:
@@ -193,12 +569,87 @@ def nth(iterable: Iterable[_T], n: int, default: Optional[_T] = None) -> Optiona
     :param n: the index of the item to fetch, starts at 0
 
     """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if isinstance(iterable, it._SEQUENCE_TYPES):
+        return iterable[n] if n < len(iterable) else default  # type: ignore[index, arg-type]
     try:
         return next(it.islice(iterable, n, n + 1))
     except StopIteration:
         return default
 
 
+def nth_combination(iterable: Iterable[_T], r: int, index: int) -> Tuple[_T, ...]:
+    """Return the combination at position *index* in the output of
+    combinations(iterable, r), without generating the earlier combinations.
+    Negative indices count from the end. Raises IndexError if index is out
+    of range.
+
+    :param iterable: the source of values
+    :param r: the length of the combination
+    :param index: the position of the combination to return
+
+    """
+    # nth_combination('abcde', 2, 8) -> ('c', 'e')
+    pool = tuple(iterable)
+    n = len(pool)
+    c = it._comb(n, r)
+    if index < 0:
+        index += c
+    if not 0 <= index < c:
+        raise IndexError("index out of range")
+    return tuple(pool[i] for i in it._combination_indices(n, r, index))
+
+
+def nth_permutation(iterable: Iterable[_T], r: Optional[int], index: int) -> Tuple[_T, ...]:
+    """Return the permutation at position *index* in the output of
+    permutations(iterable, r), without generating the earlier permutations.
+    Negative indices count from the end. Raises IndexError if index is out
+    of range.
+
+    :param iterable: the source of values
+    :param r: the length of the permutation, None means the length of iterable
+    :param index: the position of the permutation to return
+
+    """
+    # nth_permutation('abcd', 2, 5) -> ('b', 'd')
+    pool = list(iterable)
+    n = len(pool)
+    if r is None:
+        r = n
+    if not 0 <= r <= n:
+        raise ValueError("r must be between 0 and the length of iterable")
+    c = it._perm(n, r)
+    if index < 0:
+        index += c
+    if not 0 <= index < c:
+        raise IndexError("index out of range")
+    return tuple(pool.pop(d) for d in it._permutation_digits(n, r, index))
+
+
+def nth_product(index: int, *args: Iterable[_T]) -> Tuple[_T, ...]:
+    """Return the tuple at position *index* in the output of product(*args),
+    without generating the earlier tuples. Negative indices count from the
+    end. Raises IndexError if index is out of range.
+
+    :param index: the position of the tuple to return
+    :param args: sources of values
+
+    """
+    # nth_product(8, range(2), range(2), range(2), range(2)) -> (1, 0, 0, 0)
+    pools = [tuple(pool) for pool in args]
+    c = product_count(*map(len, pools))
+    if index < 0:
+        index += c
+    if not 0 <= index < c:
+        raise IndexError("index out of range")
+    result: List[_T] = [None] * len(pools)  # type: ignore[list-item]
+    for i in range(len(pools) - 1, -1, -1):
+        index, j = divmod(index, len(pools[i]))
+        result[i] = pools[i][j]
+    return tuple(result)
+
+
 def padnone(iterable: Iterable[_T]) -> Iterator[Optional[_T]]:
     """Returns the sequence elements and then returns None indefinitely.
 
@@ -241,6 +692,43 @@ def partition(pred: _Predicate[_T], iterable: Iterable[_T]) -> Tuple[Iterator[_T
     return it.filterfalse(pred, t1), filter(pred, t2)
 
 
+def permutation_count(n: int, r: Optional[int] = None) -> int:
+    """Return the number of tuples permutations() produces for r items taken
+    from a pool of n.
+
+    :param n: the size of the pool
+    :param r: the length of each permutation, None (the default) means n
+
+    """
+    # permutation_count(4, 2) -> 12
+    return it._perm(n, n if r is None else r)
+
+
+def permutation_index(element: Iterable[_T], iterable: Iterable[_T]) -> int:
+    """Return the position of *element* in the output of
+    permutations(iterable, len(element)), without generating the earlier
+    permutations. Raises ValueError if element is not a permutation of
+    iterable.
+
+    :param element: the permutation to find
+    :param iterable: the source of values the permutation was taken from
+
+    """
+    # permutation_index([1, 3, 2], range(5)) -> 19
+    pool = list(iterable)
+    index = 0
+    radix = len(pool)
+    for x in element:
+        try:
+            digit = pool.index(x)
+        except ValueError:
+            raise ValueError("element is not a permutation of iterable") from None
+        index = index * radix + digit
+        del pool[digit]
+        radix -= 1
+    return index
+
+
 def prepend(value: _T, iterator: Iterable[_T]) -> Iterator[_T]:
     """Prepend a single value in front of an iterator
 
@@ -252,8 +740,48 @@ def prepend(value: _T, iterator: Iterable[_T]) -> Iterator[_T]:
     return it.chain([value], iterator)
 
 
+def product_count(*sizes: int, r: int = 1) -> int:
+    """Return the number of tuples product() produces for pools of the given
+    sizes.
+
+    :param sizes: the size of each pool
+    :param r: number of times the pools are repeated (default is 1)
+
+    """
+    # product_count(4, 2) -> 8
+    c = 1
+    for size in sizes:
+        c *= size
+    return c**r
+
+
+def product_index(element: Iterable[_T], *args: Iterable[_T]) -> int:
+    """Return the position of *element* in the output of product(*args),
+    without generating the earlier tuples. Raises ValueError if element is
+    not a product of args.
+
+    :param element: the tuple to find
+    :param args: sources of values
+
+    """
+    # product_index([1, 0, 0, 0], range(2), range(2), range(2), range(2)) -> 8
+    element = tuple(element)
+    if len(element) != len(args):
+        raise ValueError("element is not a product of args")
+    index = 0
+    for x, arg in zip(element, args):
+        pool = tuple(arg)
+        try:
+            index = index * len(pool) + pool.index(x)
+        except ValueError:
+            raise ValueError("element is not a product of args") from None
+    return index
+
+
 def quantify(iterable: Iterable[_T], pred: _Predicate[_T] = bool) -> int:
-    """Count how many times the predicate is true.
+    """Count how many times the predicate is true. With the default
+    predicate, bytes, bytearray and numeric arrays are counted without
+    calling it, using NumPy if it is available.
 
     :param iterable: source of values
     :param pred: the predicate whose result is to be quantified when applied to
@@ -261,6 +789,21 @@ def quantify(iterable: Iterable[_T], pred: _Predicate[_T] = bool) -> int:
 
     """
     # quantify([2, 56, 3, 10, 85], lambda x: x >= 10) -> 3
+    if pred is bool:
+        values = it._as_ndarray(iterable)
+        if values is not None and values.dtype.kind in "biufc":
+            return int(it._np.count_nonzero(values))
+        if isinstance(iterable, (bytes, bytearray)):
+            try:
+                return len(iterable) - iterable.count(0)
+            except (AttributeError, TypeError):  # CircuitPython has no count(int)
+                pass
+        view = _numeric_view(iterable)
+        if view is not None:
+            if view.itemsize == 1:
+                return len(view) - view.tobytes().count(0)
+            # -0.0 == 0 but NaN != 0, as bool() sees them.
+            return len(view) - view.tolist().count(0)
     return sum(map(pred, iterable))
 
 
@@ -287,17 +830,271 @@ def roundrobin(*iterables: Iterable[_T]) -> Iterator[_T]:
 
     """
     # roundrobin('ABC', 'D', 'EF') --> A D E B F C
-    # Recipe credited to George Sakkis
-    num_active = len(iterables)
-    nexts = it.cycle(iter(it).__next__ for it in iterables)
-    while num_active:
+    nexts = [iter(iterable).__next__ for iterable in iterables]
+    while nexts:
         try:
             for n in nexts:
                 yield n()
         except StopIteration:
-            # Remove the iterator we just exhausted from the cycle.
-            num_active -= 1
-            nexts = it.cycle(it.islice(nexts, num_active))
+            # Drop the iterator we just exhausted and carry on with the one
+            # after it; the list is only rebuilt when an iterator runs out.
+            i = nexts.index(n)
+            nexts = nexts[i + 1 :] + nexts[:i]
+
+
+class run_length:
+    """Run-length encoding: encode() collapses each run of equal values into
+    a (value, count) pair, decode() expands the pairs back. Unlike counting
+    the groups of groupby(), encoding makes no object per run and does not
+    call a key function when none is given.
+
+    """
+
+    @staticmethod
+    def encode(
+        iterable: Iterable[_T], key: Optional[Callable[[_T], Any]] = None
+    ) -> Iterator[Tuple[_T, int]]:
+        """Return a (value, count) pair for each run of consecutive values
+        with equal keys, value being the first value of the run.
+
+        :param iterable: source of values
+        :param key: a function computing the key of each value; defaults to
+                    the value itself
+
+        """
+        # run_length.encode('AAAABBBCCDAAA') --> (A, 4) (B, 3) (C, 2) (D, 1) (A, 3)
+        iterator = iter(iterable)
+        try:
+            run = next(iterator)
+        except StopIteration:
+            return
+        count = 1
+        if key is None:
+            for value in iterator:
+                if value == run:
+                    count += 1
+                else:
+                    yield run, count
+                    run = value
+                    count = 1
+        else:
+            run_key = key(run)
+            for value in iterator:
+                value_key = key(value)
+                if value_key == run_key:
+                    count += 1
+                else:
+                    yield run, count
+                    run = value
+                    run_key = value_key
+                    count = 1
+        yield run, count
+
+    @staticmethod
+    def decode(iterable: Iterable[Tuple[_T, int]]) -> Iterator[_T]:
+        """Expand (value, count) pairs into count copies of each value.
+
+        :param iterable: source of (value, count) pairs
+
+        """
+        # run_length.decode([('A', 2), ('B', 1)]) --> A A B
+        return it.chain_from_iterable(it.starmap(it.repeat, iterable))
+
+
+def running_max(iterable: Iterable[_T], n: int) -> Iterator[_T]:
+    """Return the largest value of each window of n consecutive values, as
+    sliding_window() would produce them. Each value costs O(1) amortized
+    time whatever the size of the window.
+
+    :param iterable: source of values
+    :param n: window size
+
+    """
+    # running_max([1, 3, 2, 0, 1], 2) --> 3 3 2 1
+    if n < 1:
+        raise ValueError("n must be at least one")
+    return _running_extreme(iter(iterable), n, True)
+
+
+def running_mean(iterable: Iterable[_N], n: int) -> Iterator[_N]:
+    """Return the mean of each window of n consecutive values, as
+    sliding_window() would produce them. See running_sum().
+
+    :param iterable: source of numbers
+    :param n: window size
+
+    """
+    # running_mean([1, 3, 2, 0, 1], 2) --> 2.0 2.5 1.0 0.5
+    if n < 1:
+        raise ValueError("n must be at least one")
+    return (total / n for total in _running_sum(iter(iterable), n))
+
+
+def running_min(iterable: Iterable[_T], n: int) -> Iterator[_T]:
+    """Return the smallest value of each window of n consecutive values, as
+    sliding_window() would produce them. Each value costs O(1) amortized
+    time whatever the size of the window.
+
+    :param iterable: source of values
+    :param n: window size
+
+    """
+    # running_min([1, 3, 2, 0, 1], 2) --> 1 2 0 0
+    if n < 1:
+        raise ValueError("n must be at least one")
+    return _running_extreme(iter(iterable), n, False)
+
+
+def _running_extreme(iterator: Iterator[Any], n: int, largest: bool) -> Iterator[Any]:
+    # The values that can still become the extreme of a later window, with
+    # their positions, from the best (the current extreme) to the newest.
+    # candidates[head:] are live; the expired prefix is dropped once it
+    # outgrows the window, which keeps both the list and the cost bounded.
+    candidates: List[Tuple[int, Any]] = []
+    head = 0
+    for i, value in enumerate(iterator):
+        if largest:
+            while len(candidates) > head and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while len(candidates) > head and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((i, value))
+        if candidates[head][0] <= i - n:
+            head += 1
+            if head >= n:
+                del candidates[:head]
+                head = 0
+        if i >= n - 1:
+            yield candidates[head][1]
+
+
+def running_sum(iterable: Iterable[_N], n: int) -> Iterator[_N]:
+    """Return the sum of each window of n consecutive values, as
+    sliding_window() would produce them. The total is updated with the
+    value entering and the value leaving the window, and computed afresh
+    once every n values so that floating point errors do not build up.
+
+    :param iterable: source of numbers
+    :param n: window size
+
+    """
+    # running_sum([1, 3, 2, 0, 1], 2) --> 4 5 2 1
+    if n < 1:
+        raise ValueError("n must be at least one")
+    return _running_sum(iter(iterable), n)
+
+
+def _running_sum(iterator: Iterator[Any], n: int) -> Iterator[Any]:
+    window = list(it.islice(iterator, n))
+    if len(window) < n:
+        return
+    total = sum(window)
+    yield total
+    oldest = 0
+    for value in iterator:
+        total += value - window[oldest]
+        window[oldest] = value
+        oldest += 1
+        if oldest == n:
+            oldest = 0
+            total = sum(window)
+        yield total
+
+
+def running_variance(iterable: Iterable[float], n: int, ddof: int = 0) -> Iterator[float]:
+    """Return the variance of each window of n consecutive values, as
+    sliding_window() would produce them, using Welford's algorithm updated
+    for the value leaving the window. Like running_sum(), it is computed
+    afresh once every n values.
+
+    :param iterable: source of numbers
+    :param n: window size
+    :param ddof: the divisor is n - ddof: 0 (the default) for the population
+                 variance, 1 for the sample variance
+
+    """
+    # running_variance([1, 3, 2, 0, 1], 2) --> 1.0 0.25 1.0 0.25
+    if not 0 <= ddof < n:
+        raise ValueError("ddof must be in [0, n)")
+    return _running_variance(iter(iterable), n, n - ddof)
+
+
+def _welford(values: List[float]) -> Tuple[float, float]:
+    """The mean and the sum of squared differences from it."""
+    mean = 0.0
+    squares = 0.0
+    for count, value in enumerate(values, 1):
+        delta = value - mean
+        mean += delta / count
+        squares += delta * (value - mean)
+    return mean, squares
+
+
+def _running_variance(iterator: Iterator[float], n: int, divisor: int) -> Iterator[float]:
+    window = list(it.islice(iterator, n))
+    if len(window) < n:
+        return
+    mean, squares = _welford(window)
+    yield squares / divisor
+    oldest = 0
+    for value in iterator:
+        old = window[oldest]
+        old_mean = mean
+        mean += (value - old) / n
+        squares += (value - old) * (value - mean + old - old_mean)
+        window[oldest] = value
+        oldest += 1
+        if oldest == n:
+            oldest = 0
+            mean, squares = _welford(window)
+        # Rounding can take the sum of squares below zero when it should be 0.
+        yield max(squares, 0.0) / divisor
+
+
+def sliding_window(
+    iterable: Iterable[_T], n: int, step: int = 1
+) -> Iterator[Union[Tuple[_T, ...], memoryview]]:
+    """Return the windows of n consecutive values in the iterable, as tuples,
+    moving the window forward by step values each time. Values left over
+    at the end that do not fill a whole window are dropped.
+
+    Objects supporting the buffer protocol, such as bytes, bytearray or
+    array.array, yield memoryview slices sharing the original memory
+    instead, without copying any element.
+
+    :param iterable: source of values
+    :param n: window size
+    :param step: how far apart the windows start (default is 1)
+
+    """
+    # sliding_window('ABCDE', 3) --> ABC BCD CDE
+    # sliding_window('ABCDEFG', 3, 2) --> ABC CDE EFG
+    if n < 1 or step < 1:
+        raise ValueError("n and step must be at least one")
+    try:
+        view = memoryview(iterable)  # type: ignore[arg-type]
+    except TypeError:
+        return _sliding_window(iter(iterable), n, step)
+    return (view[i : i + n] for i in range(0, len(view) - n + 1, step))
+
+
+def _sliding_window(iterator: Iterator[_T], n: int, step: int) -> Iterator[Tuple[_T, ...]]:
+    window = list(it.islice(iterator, n))
+    if len(window) < n:
+        return
+    yield tuple(window)
+    oldest = 0  # ring buffer, as in tail()
+    pending = 0
+    for value in iterator:
+        window[oldest] = value
+        oldest += 1
+        if oldest == n:
+            oldest = 0
+        pending += 1
+        if pending == step:
+            pending = 0
+            yield tuple(window[oldest:] + window[:oldest])
 
 
 def tabulate(function: Callable[[int], int], start: int = 0) -> Iterator[int]:
@@ -315,21 +1112,33 @@ def tabulate(function: Callable[[int], int], start: int = 0) -> Iterator[int]:
 def tail(n: int, iterable: Iterable[_T]) -> Iterator[_T]:
     """Return an iterator over the last n items
 
+    Sequences that support len() and slicing are sliced directly; other
+    iterables are read through a ring buffer holding at most n items.
+
     :param n: how many values to return
     :param iterable: the source of values
 
     """
     # tail(3, 'ABCDEFG') --> E F G
-    i = iter(iterable)
-    buf = []
-    while True:
-        try:
-            buf.append(next(i))
-            if len(buf) > n:
-                buf.pop(0)
-        except StopIteration:
-            break
-    return iter(buf)
+    if n <= 0:
+        return iter(())
+    try:
+        return iter(iterable[max(len(iterable) - n, 0) :])  # type: ignore[index, arg-type]
+    except (TypeError, KeyError):
+        # Not a sliceable sequence (slices are hashable, so mappings raise
+        # KeyError on newer Pythons).
+        pass
+    buf: List[_T] = []
+    oldest = 0
+    for value in iterable:
+        if len(buf) < n:
+            buf.append(value)
+        else:
+            buf[oldest] = value
+            oldest += 1
+            if oldest == n:
+                oldest = 0
+    return iter(buf[oldest:] + buf[:oldest])
 
 
 def take(n: int, iterable: Iterable[_T]) -> List[_T]:
@@ -340,4 +1149,16 @@ def take(n: int, iterable: Iterable[_T]) -> List[_T]:
 
     """
     # take(3, 'ABCDEF')) -> A B C
+    if n < 0:
+        raise ValueError("n must be >= 0")
     return list(it.islice(iterable, n))
+
+
+def unbatched(batches: Iterable[Iterable[_T]]) -> Iterator[_T]:
+    """Flatten the output of batched() or chunked() back into single values.
+
+    :param batches: the batches to flatten
+
+    """
+    # unbatched([('A', 'B'), ('C',)]) --> A B C
+    return it.chain_from_iterable(batches)
@@ -0,0 +1,550 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+"""Benchmark adafruit_itertools against the CPython equivalents.
+
+Every public function of ``adafruit_itertools``,
+``adafruit_itertools.adafruit_itertools_extras`` and
+``adafruit_itertools.adafruit_itertools_cpython`` is timed next to its
+counterpart in ``itertools`` (or ``more_itertools`` for the extras) over a
+range of input sizes. For each run the throughput and the tracemalloc peak
+are reported, and everything can be written to JSON and compared against a
+previous run::
+
+  $ python -m tests.benchmark_itertools --output before.json
+  $ python -m tests.benchmark_itertools --compare before.json
+
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import operator
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import adafruit_itertools as ait
+from adafruit_itertools import adafruit_itertools_cpython as acpy
+from adafruit_itertools import adafruit_itertools_extras as aextras
+
+try:
+    import more_itertools
+except ImportError:
+    more_itertools = None
+
+# Functions that cannot be timed meaningfully in a single process loop.
+_SKIPPED = {"map_shards", "parallel_starmap", "prefetch"}
+
+
+class Case(NamedTuple):
+    """A function to time, its reference, and how to build its arguments for
+    an input size n. Both functions are called with the same arguments.
+    Functions doing big-integer arithmetic on n cap it at max_size."""
+
+    name: str
+    ours: Callable[..., Any]
+    reference: Optional[Callable[..., Any]]
+    make_args: Callable[[int], Tuple[Any, ...]]
+    max_size: Optional[int] = None
+
+
+def _bounded(func: Callable[..., Iterator[Any]]) -> Callable[..., Iterator[Any]]:
+    """Wrap an infinite iterator function to take its first n items, n being
+    the last argument."""
+
+    def run(*args: Any) -> Iterator[Any]:
+        return itertools.islice(func(*args[:-1]), args[-1])
+
+    return run
+
+
+def _drain_groups(groupby: Callable[..., Any]) -> Callable[..., Any]:
+    def run(*args: Any) -> None:
+        for _, group in groupby(*args):
+            deque(group, maxlen=0)
+
+    return run
+
+
+def _drain_all(func: Callable[..., Any]) -> Callable[..., Any]:
+    def run(*args: Any) -> None:
+        for part in func(*args):
+            deque(part, maxlen=0)
+
+    return run
+
+
+def _windowed(func: Callable[[Any], Any]) -> Optional[Callable[..., Iterator[Any]]]:
+    """The naive reference for a running statistic: func over every window."""
+    if more_itertools is None:
+        return None
+    return lambda values, n: map(func, more_itertools.sliding_window(values, n))
+
+
+def _sorted_groups(values: List[Any], key: Any, reducer: str) -> Iterator[Tuple[Any, int]]:
+    """The sort-then-groupby reference for aggregate_by(), counting only."""
+    assert reducer == "count"
+    for k, group in itertools.groupby(sorted(values, key=key), key):
+        yield k, sum(1 for _ in group)
+
+
+def _root(n: int, r: int) -> int:
+    """The pool size whose r-combinations number about n."""
+    k = r
+    while math.comb(k + 1, r) <= n:
+        k += 1
+    return k
+
+
+def _more(name: str) -> Optional[Callable[..., Any]]:
+    return getattr(more_itertools, name, None) if more_itertools else None
+
+
+def _data(n: int) -> List[int]:
+    return [i % 7 for i in range(n)]
+
+
+def _floats(n: int) -> "array[float]":
+    return array("d", [i / 8 for i in range(n)])
+
+
+CASES = [
+    Case("accumulate", ait.accumulate, itertools.accumulate, lambda n: (range(n),)),
+    Case(
+        "accumulate[max]",
+        ait.accumulate,
+        itertools.accumulate,
+        lambda n: (_data(n), max),
+    ),
+    Case(
+        "accumulate[operator.xor]",
+        ait.accumulate,
+        itertools.accumulate,
+        lambda n: (range(n), operator.xor),
+    ),
+    Case(
+        "accumulate[float array]",
+        ait.accumulate,
+        itertools.accumulate,
+        lambda n: (_floats(n),),
+    ),
+    Case("chain", ait.chain, itertools.chain, lambda n: (range(n // 2), range(n - n // 2))),
+    Case(
+        "chain_from_iterable",
+        ait.chain_from_iterable,
+        itertools.chain.from_iterable,
+        lambda n: ([range(10)] * (n // 10),),
+    ),
+    Case(
+        "combinations", ait.combinations, itertools.combinations, lambda n: (range(_root(n, 3)), 3)
+    ),
+    Case(
+        "combinations_with_replacement",
+        ait.combinations_with_replacement,
+        itertools.combinations_with_replacement,
+        lambda n: (range(_root(n, 3) - 2), 3),
+    ),
+    Case("compress", ait.compress, itertools.compress, lambda n: (range(n), _data(n))),
+    Case(
+        "compress[float array]",
+        ait.compress,
+        itertools.compress,
+        lambda n: (_floats(n), array("b", _data(n))),
+    ),
+    Case("count", _bounded(ait.count), _bounded(itertools.count), lambda n: (0, 1, n)),
+    Case("cycle", _bounded(ait.cycle), _bounded(itertools.cycle), lambda n: (range(10), n)),
+    Case(
+        "cycle[compact floats]",
+        _bounded(lambda p: ait.cycle(p, compact=True)),
+        _bounded(itertools.cycle),
+        lambda n: (iter(_floats(n)), 3 * n),
+    ),
+    Case(
+        "dropwhile",
+        ait.dropwhile,
+        itertools.dropwhile,
+        lambda n: (lambda x: x < n // 2, range(n)),
+    ),
+    Case("filterfalse", ait.filterfalse, itertools.filterfalse, lambda n: (None, _data(n))),
+    Case(
+        "groupby",
+        _drain_groups(ait.groupby),
+        _drain_groups(itertools.groupby),
+        lambda n: (sorted(_data(n)),),
+    ),
+    Case(
+        "groupby[presorted]",
+        _drain_groups(lambda values: ait.groupby(values, presorted=True)),
+        _drain_groups(itertools.groupby),
+        lambda n: (sorted(_data(n)),),
+    ),
+    Case("islice", ait.islice, itertools.islice, lambda n: (range(2 * n), 0, None, 2)),
+    Case(
+        "permutations", ait.permutations, itertools.permutations, lambda n: (range(_root(n, 3)), 3)
+    ),
+    Case("product", ait.product, itertools.product, lambda n: (range(_root(n, 2)), range(n // 50))),
+    Case("repeat", ait.repeat, itertools.repeat, lambda n: (None, n)),
+    Case("starmap", ait.starmap, itertools.starmap, lambda n: (pow, [(2, 5)] * n)),
+    Case("takewhile", ait.takewhile, itertools.takewhile, lambda n: (bool, [1] * n)),
+    Case("tee", _drain_all(ait.tee), _drain_all(itertools.tee), lambda n: (iter(range(n)), 3)),
+    Case(
+        "zip_longest",
+        ait.zip_longest,
+        itertools.zip_longest,
+        lambda n: (range(n), range(n // 2)),
+    ),
+    Case(
+        "zip_longest[100 columns]",
+        ait.zip_longest,
+        itertools.zip_longest,
+        lambda n: tuple(range(i * n // 100) for i in range(1, 101)),
+    ),
+    Case(
+        "aggregate_by",
+        aextras.aggregate_by,
+        _sorted_groups,
+        lambda n: (_data(n), None, "count"),
+    ),
+    Case("all_equal", aextras.all_equal, _more("all_equal"), lambda n: ([1] * n,)),
+    Case("all_equal[bytes]", aextras.all_equal, _more("all_equal"), lambda n: (bytes(n),)),
+    Case(
+        "all_equal[array]",
+        aextras.all_equal,
+        _more("all_equal"),
+        lambda n: (array("d", bytes(8 * n)),),
+    ),
+    Case("batched", aextras.batched, _more("batched"), lambda n: (range(n), 100)),
+    Case(
+        "batched[into array]",
+        lambda values, n: aextras.batched(values, n, into=array("d", bytes(8 * n))),
+        _more("batched"),
+        lambda n: ([float(x) for x in range(n)], 100),
+    ),
+    Case("chunked", aextras.chunked, _more("chunked"), lambda n: (bytearray(n), 256)),
+    Case(
+        "combination_count",
+        aextras.combination_count,
+        math.comb,
+        lambda n: (n, n // 2),
+        200,
+    ),
+    Case(
+        "combination_index",
+        aextras.combination_index,
+        _more("combination_index"),
+        lambda n: (range(1, n, 2), range(n)),
+        200,
+    ),
+    Case("dotproduct", aextras.dotproduct, _more("dotproduct"), lambda n: (range(n), range(n))),
+    Case(
+        "dotproduct[float array]",
+        aextras.dotproduct,
+        _more("dotproduct"),
+        lambda n: (_floats(n), _floats(n)),
+    ),
+    Case("ewma", aextras.ewma, None, lambda n: (_floats(n), 0.1)),
+    Case("first_true", aextras.first_true, _more("first_true"), lambda n: ([0] * n,)),
+    Case("first_true[bytes]", aextras.first_true, _more("first_true"), lambda n: (bytes(n),)),
+    Case("flatten", aextras.flatten, _more("flatten"), lambda n: ([range(10)] * (n // 10),)),
+    Case("grouper", aextras.grouper, _more("grouper"), lambda n: (range(n), 3)),
+    Case(
+        "iter_except",
+        aextras.iter_except,
+        _more("iter_except"),
+        lambda n: (list(range(n)).pop, IndexError),
+    ),
+    Case(
+        "merge",
+        aextras.merge,
+        heapq.merge,
+        lambda n: tuple(range(i, n, 100) for i in range(100)),
+    ),
+    Case(
+        "merge[2000 sources]",
+        aextras.merge,
+        heapq.merge,
+        lambda n: tuple(range(i, n, 2000) for i in range(2000)),
+    ),
+    Case("ncycles", aextras.ncycles, _more("ncycles"), lambda n: (range(n // 10), 10)),
+    Case("nth", aextras.nth, _more("nth"), lambda n: (iter(range(n)), n - 1)),
+    Case("nth[list]", aextras.nth, _more("nth"), lambda n: (list(range(n)), n - 1)),
+    Case(
+        "nth_combination",
+        aextras.nth_combination,
+        _more("nth_combination"),
+        lambda n: (range(n), n // 2, math.comb(n, n // 2) // 3),
+        200,
+    ),
+    Case(
+        "nth_permutation",
+        aextras.nth_permutation,
+        _more("nth_permutation"),
+        lambda n: (range(n), n // 2, math.perm(n, n // 2) // 3),
+        200,
+    ),
+    Case(
+        "nth_product",
+        aextras.nth_product,
+        _more("nth_product"),
+        lambda n: (2 ** (n // 2), *[range(4)] * n),
+        200,
+    ),
+    Case("padnone", _bounded(aextras.padnone), _bounded(_more("padnone")), lambda n: ([1], n)),
+    Case("pairwise", aextras.pairwise, _more("pairwise"), lambda n: (iter(range(n)),)),
+    Case(
+        "partition",
+        _drain_all(aextras.partition),
+        _drain_all(_more("partition")),
+        lambda n: (bool, iter(_data(n))),
+    ),
+    Case(
+        "permutation_count",
+        aextras.permutation_count,
+        math.perm,
+        lambda n: (n, n // 2),
+        200,
+    ),
+    Case(
+        "permutation_index",
+        aextras.permutation_index,
+        _more("permutation_index"),
+        lambda n: (range(n - 1, -1, -2), range(n)),
+        200,
+    ),
+    Case("prepend", aextras.prepend, _more("prepend"), lambda n: (0, range(n))),
+    Case(
+        "product_count",
+        aextras.product_count,
+        lambda *sizes: math.prod(sizes),
+        lambda n: tuple(range(1, n)),
+        200,
+    ),
+    Case(
+        "product_index",
+        aextras.product_index,
+        _more("product_index"),
+        lambda n: ([3] * n, *[range(4)] * n),
+        200,
+    ),
+    Case("quantify", aextras.quantify, _more("quantify"), lambda n: (_data(n),)),
+    Case(
+        "quantify[bytes]",
+        aextras.quantify,
+        _more("quantify"),
+        lambda n: (bytes(_data(n)),),
+    ),
+    Case(
+        "quantify[float array]",
+        aextras.quantify,
+        _more("quantify"),
+        lambda n: (array("d", _data(n)),),
+    ),
+    Case(
+        "repeatfunc",
+        aextras.repeatfunc,
+        _more("repeatfunc"),
+        lambda n: (int, n),
+    ),
+    Case(
+        "roundrobin",
+        aextras.roundrobin,
+        _more("roundrobin"),
+        lambda n: tuple(range(i, n, 100) for i in range(100)),
+    ),
+    Case(
+        "run_length",
+        aextras.run_length.encode,
+        lambda values: ((k, sum(1 for _ in g)) for k, g in itertools.groupby(values)),
+        lambda n: (sorted(_data(n)),),
+    ),
+    Case(
+        "run_length.decode",
+        aextras.run_length.decode,
+        _more("run_length") and _more("run_length").decode,
+        lambda n: ([(i, 100) for i in range(n // 100)],),
+    ),
+    Case("running_max", aextras.running_max, _windowed(max), lambda n: (_data(n), 100)),
+    Case(
+        "running_mean",
+        aextras.running_mean,
+        _windowed(lambda w: sum(w) / len(w)),
+        lambda n: (_floats(n), 100),
+    ),
+    Case("running_min", aextras.running_min, _windowed(min), lambda n: (_data(n), 100)),
+    Case("running_sum", aextras.running_sum, _windowed(sum), lambda n: (_data(n), 100)),
+    Case(
+        "running_variance",
+        aextras.running_variance,
+        _windowed(statistics.pvariance),
+        lambda n: (_floats(n), 100),
+        10000,
+    ),
+    Case(
+        "sliding_window",
+        aextras.sliding_window,
+        _more("sliding_window"),
+        lambda n: (bytearray(n), 256),
+    ),
+    Case(
+        "sorted_external",
+        acpy.sorted_external,
+        lambda values, key, _: sorted(values, key=key),
+        lambda n: (_floats(n)[::-1], None, max(n // 10, 1)),
+    ),
+    Case(
+        "StructSerializer",
+        lambda values, size: acpy.sorted_external(
+            values, None, size, None, acpy.StructSerializer("d")
+        ),
+        lambda values, _: sorted(values),
+        lambda n: (_floats(n)[::-1], max(n // 10, 1)),
+    ),
+    Case(
+        "tabulate",
+        _bounded(aextras.tabulate),
+        _bounded(_more("tabulate")),
+        lambda n: (abs, 0, n),
+    ),
+    Case("tail", aextras.tail, _more("tail"), lambda n: (100, iter(range(n)))),
+    Case("take", aextras.take, _more("take"), lambda n: (n, iter(range(2 * n)))),
+    Case(
+        "unbatched",
+        aextras.unbatched,
+        itertools.chain.from_iterable,
+        lambda n: ([tuple(range(10))] * (n // 10),),
+    ),
+]
+
+
+def _consume(result: Any) -> None:
+    if hasattr(result, "__next__"):
+        deque(result, maxlen=0)
+
+
+def _time(
+    func: Callable[..., Any], make_args: Callable[[int], Tuple[Any, ...]], n: int, repeat: int
+) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        args = make_args(n)
+        start = time.perf_counter()
+        _consume(func(*args))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak(func: Callable[..., Any], make_args: Callable[[int], Tuple[Any, ...]], n: int) -> int:
+    args = make_args(n)
+    tracemalloc.start()
+    try:
+        _consume(func(*args))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes: List[int], repeat: int, only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Time every case at every size, returning one record per case, size
+    and implementation."""
+    results = []
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        impls = [("adafruit", case.ours)]
+        if case.reference is not None:
+            impls.append(("cpython", case.reference))
+        for n in sorted({min(size, case.max_size or size) for size in sizes}):
+            for impl, func in impls:
+                seconds = _time(func, case.make_args, n, repeat)
+                peak = _peak(func, case.make_args, n)
+                results.append(
+                    {
+                        "function": case.name,
+                        "impl": impl,
+                        "size": n,
+                        "seconds": seconds,
+                        "items_per_second": n / seconds if seconds else math.inf,
+                        "peak_bytes": peak,
+                        "peak_bytes_per_item": peak / n,
+                    }
+                )
+    return results
+
+
+def uncovered() -> List[str]:
+    """Public functions that have no benchmark case."""
+    names = {case.name for case in CASES} | _SKIPPED
+    public = set()
+    for module in (ait, aextras, acpy):
+        for name in dir(module):
+            obj = getattr(module, name)
+            if (
+                not name.startswith("_")
+                and callable(obj)
+                and getattr(obj, "__module__", None) == module.__name__
+            ):
+                public.add(name)
+    return sorted(public - names)
+
+
+def _report(results: List[Dict[str, Any]], previous: Optional[List[Dict[str, Any]]]) -> None:
+    before = {}
+    if previous:
+        before = {(r["function"], r["impl"], r["size"]): r["seconds"] for r in previous}
+    print(
+        f"{'function':30} {'impl':8} {'size':>8} {'items/s':>12} {'peak B/item':>12}"
+        + ("  vs previous" if before else "")
+    )
+    for r in results:
+        line = (
+            f"{r['function']:30} {r['impl']:8} {r['size']:>8} "
+            f"{r['items_per_second']:>12.4g} {r['peak_bytes_per_item']:>12.3g}"
+        )
+        old = before.get((r["function"], r["impl"], r["size"]))
+        if old and r["seconds"]:
+            line += f"  {old / r['seconds']:.2f}x"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many runs")
+    parser.add_argument("--only", nargs="+", help="names of the functions to run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="show speedups relative to this JSON file")
+    args = parser.parse_args(argv)
+
+    missing = uncovered()
+    if missing:
+        print("warning: no benchmark for " + ", ".join(missing), file=sys.stderr)
+
+    results = run(args.sizes, args.repeat, args.only)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+    _report(results, previous)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_implementation() + " " + platform.python_version(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
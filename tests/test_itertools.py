@@ -2,6 +2,11 @@
 # SPDX-License-Identifier: MIT
 
 import itertools as it
+import math
+import operator
+import subprocess
+import sys
+from array import array
 from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, TypeVar, Union
 
 import pytest
@@ -32,6 +37,35 @@ def test_accumulate_with(seq: Sequence[_T], func: Callable[[_T, _T], _T]) -> Non
     assert x == y
 
 
+@pytest.mark.parametrize(
+    "func",
+    [operator.add, operator.mul, max, min, operator.and_, operator.or_, operator.xor],
+)
+@pytest.mark.parametrize("initial", [None, 0, 7])
+def test_accumulate_operators(func: Callable[[int, int], int], initial: Optional[int]) -> None:
+    values = [3, 12, 5, -2, 5, 9, 0, 6]
+    assert list(ait.accumulate(values, func, initial=initial)) == list(
+        it.accumulate(values, func, initial=initial)
+    )
+    assert list(ait.accumulate([], func, initial=initial)) == list(
+        it.accumulate([], func, initial=initial)
+    )
+
+
+def test_accumulate_initial() -> None:
+    assert list(ait.accumulate("abc", initial="x")) == ["x", "xa", "xab", "xabc"]
+    lists = list(ait.accumulate([[1], [2]], initial=[0]))
+    assert lists == [[0], [0, 1], [0, 1, 2]]
+    assert list(ait.accumulate(array("d", [1.0, 2.0]), initial=1)) == [1, 2.0, 4.0]
+    assert list(ait.accumulate([(1, "a"), (1, "b"), (2, "c")], max)) == [
+        (1, "a"),
+        (1, "b"),
+        (2, "c"),
+    ]
+    assert list(ait.accumulate([1.0, 1, True], max)) == [1.0, 1.0, 1.0]
+    assert [type(x) for x in ait.accumulate([1.0, 1, True], max)] == [float] * 3
+
+
 def test_accumulate_types() -> None:
     x_int: Iterator[int] = ait.accumulate([1, 2, 3])
     assert list(x_int) == list(it.accumulate([1, 2, 3]))
@@ -137,6 +171,48 @@ def test_combo_with_replacement(seq: Sequence[_T], n: int) -> None:
     assert x == y
 
 
+@pytest.mark.parametrize(
+    "func, args",
+    [
+        (ait.combinations, ("abcdefg", 3)),
+        (ait.combinations, ("abc", 0)),
+        (ait.combinations_with_replacement, ("abcde", 3)),
+        (ait.combinations_with_replacement, ("", 0)),
+        (ait.permutations, ("abcde",)),
+        (ait.permutations, ("abcde", 2)),
+        (ait.permutations, ("", 0)),
+        (ait.product, ("abc", "xyz")),
+    ],
+)
+def test_shard(func: Callable[..., Iterator[Tuple[str, ...]]], args: Tuple[Any, ...]) -> None:
+    expected = list(func(*args))
+    for n in (1, 2, 3, 7, 100):
+        shards = [list(func(*args, shard=(k, n))) for k in range(n)]
+        assert [t for shard in shards for t in shard] == expected
+        assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    with pytest.raises(ValueError):
+        list(func(*args, shard=(2, 2)))
+
+
+@pytest.mark.parametrize(
+    "func, args",
+    [
+        (ait.combinations, ("abcdefg", 3)),
+        (ait.combinations, ("abc", 0)),
+        (ait.combinations_with_replacement, ("abcde", 3)),
+        (ait.permutations, ("abcde",)),
+        (ait.permutations, ("abcde", 2)),
+    ],
+)
+def test_reuse(func: Callable[..., Iterator[Sequence[str]]], args: Tuple[Any, ...]) -> None:
+    expected = list(func(*args))
+    results = [tuple(x) for x in func(*args, reuse=True)]
+    assert results == expected
+    for k in range(3):
+        results = [tuple(x) for x in func(*args, shard=(k, 3), reuse=True)]
+        assert results == list(func(*args, shard=(k, 3)))
+
+
 @pytest.mark.parametrize(
     "data, selectors",
     [
@@ -157,6 +233,60 @@ def test_compress(data: Sequence[int], selectors: Sequence[Any]) -> None:
     assert x == y
 
 
+@pytest.mark.parametrize("func", [None, operator.add, operator.mul, max, min, pow])
+def test_accumulate_arrays(func: Optional[Callable[[Any, Any], Any]]) -> None:
+    np = pytest.importorskip("numpy")
+    values = [0.5, -2.0, 3.25, 1.5, -0.75, 4.0]
+    args = () if func is None else (func,)
+    expected = list(it.accumulate(values, *args))
+    for source in (array("d", values), array("f", values), memoryview(array("d", values))):
+        result = list(ait.accumulate(source, *args))
+        assert result == expected
+        assert all(type(x) is float for x in result)
+    assert list(ait.accumulate(np.array(values), *args)) == expected
+    assert list(ait.accumulate(np.array([1.0, float("nan"), 3.0]), max))[2] == 3.0
+    zeros = [-0.0, 0.0, -0.0]
+    for f in (max, min):
+        result = list(ait.accumulate(np.array(zeros), f))
+        assert [math.copysign(1, x) for x in result] == [
+            math.copysign(1, x) for x in it.accumulate(zeros, f)
+        ]
+    assert list(ait.accumulate(array("q", [2**62] * 3))) == [2**62, 2**63, 3 * 2**62]
+
+
+def test_arrays_lazy(monkeypatch: pytest.MonkeyPatch) -> None:
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(np, "cumsum", None)  # array.array does not go through NumPy
+    values = array("d", [0.5, 2.0, 1.5])
+    assert list(ait.accumulate(values)) == list(it.accumulate(values))
+    data = array("d", range(5000))
+    selected = ait.compress(data, array("b", [1] * 5000))
+    assert next(selected) == 0.0
+    assert list(selected) == list(range(1, 5000))
+
+
+def test_compress_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    data = array("d", [1.5, 2.5, 3.5, 4.5, 5.5])
+    selectors = array("b", [1, 0, 0, 1])
+    assert list(ait.compress(data, selectors)) == [1.5, 4.5]
+    assert list(ait.compress(np.arange(5), np.array([True, False, True]))) == [0, 2]
+    assert list(ait.compress(data, [0, 1])) == [2.5]
+
+
+def test_numpy_imported_lazily() -> None:
+    code = "import sys, adafruit_itertools; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True)
+    assert result.stdout.strip() == b"False"
+
+
+def test_arrays_without_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ait, "_np", False)
+    values = array("d", [0.5, 2.0, 1.5])
+    assert list(ait.accumulate(values)) == list(it.accumulate(values))
+    assert list(ait.compress(values, array("b", [1, 0, 1]))) == [0.5, 1.5]
+
+
 def test_count() -> None:
     assert _take(5, it.count()) == _take(5, ait.count())
     for start in range(-10, 10):
@@ -184,6 +314,34 @@ def test_cycle(seq: Sequence[_T]) -> None:
     assert _take(10, x) == _take(10, y)
 
 
+@pytest.mark.parametrize(
+    "seq",
+    [
+        [],
+        list(range(-3000, 3000, 3)),
+        [x / 3 for x in range(2500)],
+        [bytes([x % 256]) * (x % 5) for x in range(2100)],
+        [1, 2.0, b"3", None],
+        [1] * 1500 + [2.5] * 10,
+        [1] * 1500 + [2**70],
+        [b"a"] * 1500 + ["b"],
+        [True, False] * 700,
+    ],
+)
+def test_cycle_compact(seq: Sequence[Any]) -> None:
+    expected = _take(3 * len(seq) + 5, it.cycle(seq))
+    result = _take(3 * len(seq) + 5, ait.cycle(iter(seq), compact=True))
+    assert result == expected
+    assert [type(x) for x in result] == [type(x) for x in expected]
+
+
+def test_cycle_compact_storage() -> None:
+    cache = ait._Cache(x / 2 for x in range(5000))
+    assert cache.items.typecode == "d"
+    assert list(cache) == list(cache) == [x / 2 for x in range(5000)]
+    assert ait._Cache([2**70]).kind is list
+
+
 @pytest.mark.parametrize(
     "predicate, seq",
     [
@@ -237,6 +395,52 @@ def test_groupby(data: Sequence[_T], key: Callable[[_T], _K]) -> None:
     assert it_l == ait_l
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        sorted("AAAABBBCCDAABBB"),
+        "AAAABBBCCD",
+        "",
+        "Z",
+        range(10),
+        array("i", sorted(x % 13 for x in range(1000))),
+        memoryview(bytes(sorted(x % 200 for x in range(5000)))),
+        bytes(sorted(x % 7 for x in range(100))),
+        bytearray(sorted(x % 7 for x in range(100))),
+        [1, 1, 2, 3, 3, 3],
+        (1, 1, 2, 3, 3, 3),
+    ],
+)
+def test_groupby_presorted(data: Sequence[Any]) -> None:
+    expected = [(k, list(g)) for k, g in it.groupby(data)]
+    groups = list(ait.groupby(data, presorted=True))
+    assert [(k, list(g)) for k, g in groups] == expected
+    if isinstance(data, (array, bytearray, bytes, memoryview)):
+        assert all(type(g) is memoryview for _, g in groups)
+    else:
+        assert all(type(g) is type(data[:0]) for _, g in groups)
+
+
+def test_groupby_presorted_key() -> None:
+    calls = []
+
+    def key(x: int) -> int:
+        calls.append(x)
+        return x // 100000
+
+    data = range(1000000)
+    groups = [(k, len(g)) for k, g in ait.groupby(data, key, presorted=True)]
+    assert groups == [(k, 100000) for k in range(10)]
+    assert len(calls) < 10 * 2 * 20
+    words = ["apple", "avocado", "banana", "blueberry", "cherry"]
+    assert [(k, list(g)) for k, g in ait.groupby(words, lambda w: w[0], presorted=True)] == [
+        (k, list(g)) for k, g in it.groupby(words, lambda w: w[0])
+    ]
+    assert [(k, list(g)) for k, g in ait.groupby(iter(words), len, presorted=True)] == [
+        (k, list(g)) for k, g in it.groupby(words, len)
+    ]
+
+
 def test_groupby_types() -> None:
     assert list(ait.groupby([])) == list(it.groupby([]))
     assert list(ait.groupby([], key=id)) == list(it.groupby([], key=id))
@@ -307,13 +511,80 @@ def test_islice_start_stop_step(
     assert list(x) == list(y)
 
 
+def test_islice_changing_sequence() -> None:
+    for stop in (None, 4):
+        data = [1, 2, 3]
+        result = []
+        for x in ait.islice(data, 0, stop):
+            result.append(x)
+            if len(data) < 5:
+                data.append(9)
+        data = [1, 2, 3]
+        expected = []
+        for x in it.islice(data, 0, stop):
+            expected.append(x)
+            if len(data) < 5:
+                data.append(9)
+        assert result == expected
+    data = [1, 2, 3, 4]
+    result = []
+    for x in ait.islice(data, 0, None):
+        result.append(x)
+        data.pop()
+    assert result == [1, 2]
+
+
+def test_islice_sequence_subclass() -> None:
+    class Reversed(list):
+        def __iter__(self) -> Iterator[Any]:
+            return reversed(self)
+
+    assert list(ait.islice(Reversed([1, 2, 3]), 2)) == list(it.islice(Reversed([1, 2, 3]), 2))
+
+
 def test_islice_error() -> None:
-    with pytest.raises(ValueError):
-        list(ait.islice("abc", -1))
-    with pytest.raises(ValueError):
-        list(ait.islice("abc", 0, -1))
     with pytest.raises(ValueError):
         list(ait.islice("abc", 0, 0, 0))
+    with pytest.raises(ValueError):
+        list(ait.islice(iter("abc"), 0, None, -1))
+
+
+@pytest.mark.parametrize(
+    "start, stop, step",
+    [
+        (-3, None, 1),
+        (-3, -1, 1),
+        (-20, None, 2),
+        (-5, 6, 1),
+        (0, -2, 1),
+        (1, -2, 2),
+        (2, -20, 1),
+        (5, -1, 3),
+    ],
+)
+def test_islice_negative(start: int, stop: Optional[int], step: int) -> None:
+    seq = "ABCDEFGHIJ"
+    expected = list(seq[start:stop:step])
+    assert list(ait.islice(seq, start, stop, step)) == expected
+    assert list(ait.islice(iter(seq), start, stop, step)) == expected
+
+
+@pytest.mark.parametrize(
+    "seq",
+    [
+        list(range(10)),
+        tuple(range(10)),
+        range(10),
+        bytes(range(10)),
+        bytearray(range(10)),
+        memoryview(bytes(range(10))),
+    ],
+)
+def test_islice_sequence(seq: Sequence[int]) -> None:
+    for start, stop, step in [(0, None, 1), (2, 8, 3), (9, 30, 1), (0, 0, 1)]:
+        x: Iterator[int] = ait.islice(seq, start, stop, step)
+        y: Iterator[int] = it.islice(seq, start, stop, step)
+        assert list(x) == list(y)
 
 
 @pytest.mark.parametrize(
@@ -375,6 +646,43 @@ def test_product_two(seq1: Sequence[str], seq2: Sequence[int]) -> None:
         assert list(x_repeat) == list(y_repeat)
 
 
+@pytest.mark.parametrize(
+    "seq1, seq2, start",
+    [
+        ("ABCD", "xy", 0),
+        ("ABCD", "xy", 5),
+        ("ABCD", "xy", 8),
+        ("ABCD", "xy", 20),
+        ("", "xy", 0),
+    ],
+)
+def test_product_start_index(seq1: Sequence[str], seq2: Sequence[str], start: int) -> None:
+    expected = list(it.product(seq1, seq2))[start:]
+    x = ait.product(seq1, seq2, start_index=start)
+    assert x.remaining == len(expected)
+    assert list(x) == expected
+    assert x.remaining == 0
+
+
+def test_product_lazy() -> None:
+    x = ait.product(range(10), r=6)
+    assert x.remaining == 10**6
+    assert next(x) == (0,) * 6
+    assert next(x) == (0, 0, 0, 0, 0, 1)
+    assert x.remaining == 10**6 - 2
+    x = ait.product(range(10), r=20)
+    assert x.remaining == 10**20
+    with pytest.raises(TypeError):
+        len(x)  # type: ignore[arg-type]
+    assert list(ait.islice(x, 2)) == [(0,) * 20, (0,) * 19 + (1,)]
+    assert list(ait.product(range(10), r=20, start_index=10**20 - 2)) == [
+        (9,) * 19 + (8,),
+        (9,) * 20,
+    ]
+    with pytest.raises(ValueError):
+        ait.product("abc", start_index=-1)
+
+
 @pytest.mark.parametrize(
     "element",
     ["", None, 5, "abc"],
@@ -432,6 +740,27 @@ def test_tee(seq: Sequence[_T]) -> None:
         assert [list(v) for v in x] == [list(v) for v in y]
 
 
+def test_tee_generator() -> None:
+    a, b, c = ait.tee((x for x in range(100)), 3)
+    assert _take(10, a) == list(range(10))
+    assert _take(5, b) == list(range(5))
+    assert list(c) == list(range(100))
+    assert list(b) == list(range(5, 100))
+    assert list(a) == list(range(10, 100))
+
+
+def test_tee_buffered() -> None:
+    a, b = ait.tee(iter(range(1000)))
+    assert a.buffered() == 0  # type: ignore[attr-defined]
+    _take(300, a)
+    assert a.buffered() == b.buffered() == 300  # type: ignore[attr-defined]
+    _take(250, b)
+    assert a.buffered() == 50  # type: ignore[attr-defined]
+    _take(50, b)
+    assert b.buffered() == 0  # type: ignore[attr-defined]
+    assert list(zip(a, b)) == [(x, x) for x in range(300, 1000)]
+
+
 @pytest.mark.parametrize(
     "seq1, seq2",
     [
@@ -445,3 +774,22 @@ def test_zip_longest(seq1: Sequence[str], seq2: Sequence[int]) -> None:
     x: Iterator[Tuple[str, int]] = ait.zip_longest(seq1, seq2)
     y: Iterator[Tuple[str, int]] = it.zip_longest(seq1, seq2)
     assert list(x) == list(y)
+
+
+def test_zip_longest_wide() -> None:
+    columns = [range(i) for i in range(100)]
+    x: Iterator[Tuple[int, ...]] = ait.zip_longest(*columns, fillvalue=-1)
+    y: Iterator[Tuple[int, ...]] = it.zip_longest(*columns, fillvalue=-1)
+    assert list(x) == list(y)
+    assert list(ait.zip_longest()) == list(it.zip_longest())
+
+
+def test_zip_longest_strict() -> None:
+    assert list(ait.zip_longest("abc", [1, 2, 3], strict=True)) == list(zip("abc", [1, 2, 3]))
+    x = ait.zip_longest("abc", [1, 2], strict=True)
+    assert next(x) == ("a", 1)
+    assert next(x) == ("b", 2)
+    with pytest.raises(ValueError):
+        next(x)
+    with pytest.raises(ValueError):
+        list(ait.zip_longest("", [1], strict=True))
@@ -0,0 +1,213 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Iterable, List, Sequence, TypeVar
+
+import pytest
+
+import adafruit_itertools as ait
+from adafruit_itertools import adafruit_itertools_aio as aio
+
+_T = TypeVar("_T")
+
+
+def _run(awaitable: Awaitable[_T]) -> _T:
+    return asyncio.run(awaitable)  # type: ignore[arg-type]
+
+
+async def _agen(values: Iterable[_T]) -> AsyncIterator[_T]:
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+
+async def _alist(iterator: AsyncIterator[_T]) -> List[_T]:
+    return [value async for value in iterator]
+
+
+def _collect(iterator: AsyncIterator[_T]) -> List[_T]:
+    return _run(_alist(iterator))
+
+
+@pytest.mark.parametrize("seq", [[1, 2, 3, 4], [], ["a", "b"]])
+def test_accumulate(seq: Sequence[Any]) -> None:
+    assert _collect(aio.accumulate(_agen(seq))) == list(ait.accumulate(seq))
+    assert _collect(aio.accumulate(seq, max)) == list(ait.accumulate(seq, max))
+
+
+def test_accumulate_initial() -> None:
+    assert _collect(aio.accumulate(_agen([1, 2, 3]), initial=10)) == [10, 11, 13, 16]
+    assert _collect(aio.accumulate([], initial=10)) == [10]
+
+
+def test_sync_source_yields_to_loop() -> None:
+    async def count_turns(turns: List[int]) -> None:
+        while True:
+            turns[0] += 1
+            await asyncio.sleep(0)
+
+    async def main() -> int:
+        turns = [0]
+        counter = asyncio.create_task(count_turns(turns))
+        await asyncio.sleep(0)
+        before = turns[0]
+        assert len(await _alist(aio.accumulate(range(1000)))) == 1000
+        counter.cancel()
+        return turns[0] - before
+
+    assert _run(main()) >= 1000 // aio._SyncIterator.YIELD_EVERY
+
+
+def test_chain() -> None:
+    assert _collect(aio.chain(_agen("ab"), "", _agen("c"), "de")) == list("abcde")
+    assert _collect(aio.chain()) == []
+
+
+@pytest.mark.parametrize("seq", [[1, 4, 6, 4, 1], [], [9]])
+def test_dropwhile_takewhile(seq: Sequence[int]) -> None:
+    assert _collect(aio.dropwhile(lambda x: x < 5, _agen(seq))) == list(
+        ait.dropwhile(lambda x: x < 5, seq)
+    )
+    assert _collect(aio.takewhile(lambda x: x < 5, _agen(seq))) == list(
+        ait.takewhile(lambda x: x < 5, seq)
+    )
+
+
+@pytest.mark.parametrize("data", ["AAAABBBCCDAABBB", "", "A"])
+def test_groupby(data: str) -> None:
+    async def groups() -> List[Any]:
+        return [(k, await _alist(g)) async for k, g in aio.groupby(_agen(data))]
+
+    assert _run(groups()) == [(k, list(g)) for k, g in ait.groupby(data)]
+
+    async def keys() -> List[Any]:
+        return [k async for k, _ in aio.groupby(_agen(data), key=str.lower)]
+
+    assert _run(keys()) == [k for k, _ in ait.groupby(data, key=str.lower)]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [(3,), (2, 6), (2, None), (0, None, 3), (20, 30), (1, 9, 2)],
+)
+def test_islice(args: Any) -> None:
+    assert _collect(aio.islice(_agen("ABCDEFG"), *args)) == list(ait.islice("ABCDEFG", *args))
+    with pytest.raises(ValueError):
+        aio.islice("abc", -1)
+
+
+def test_roundrobin() -> None:
+    assert _collect(aio.roundrobin(_agen("ABC"), "D", _agen("EF"))) == list("ADEBFC")
+
+
+def test_zip_longest() -> None:
+    assert _collect(aio.zip_longest(_agen("ABCD"), "xy", fillvalue="-")) == list(
+        ait.zip_longest("ABCD", "xy", fillvalue="-")
+    )
+    assert _collect(aio.zip_longest()) == []
+
+
+def test_take_tail() -> None:
+    assert _run(aio.take(3, _agen("ABCDEF"))) == list("ABC")
+    assert _run(aio.take(10, "AB")) == list("AB")
+    assert _run(aio.tail(3, _agen("ABCDEFG"))) == list("EFG")
+    assert _run(aio.tail(0, "ABC")) == []
+
+
+def test_tee() -> None:
+    async def main() -> List[List[int]]:
+        a, b, c = aio.tee(_agen(range(20)), 3)
+        first = [await a.__anext__() for _ in range(5)]
+        assert a.buffered() == 5
+        return [first + await _alist(a), await _alist(b), await _alist(c)]
+
+    assert _run(main()) == [list(range(20))] * 3
+
+
+def test_tee_outside_loop() -> None:
+    a, b = aio.tee(range(10), maxlag=2)
+
+    async def main() -> List[List[int]]:
+        return list(await asyncio.gather(_alist(a), _alist(b)))
+
+    assert _run(main()) == [list(range(10))] * 2
+
+
+def test_tee_maxlag() -> None:
+    async def consume(iterator: AsyncIterator[int], log: List[int], delay: int) -> List[int]:
+        result = []
+        async for value in iterator:
+            log.append(iterator.buffered())  # type: ignore[attr-defined]
+            result.append(value)
+            for _ in range(delay):
+                await asyncio.sleep(0)
+        return result
+
+    async def main() -> List[List[int]]:
+        log: List[int] = []
+        a, b = aio.tee(range(50), maxlag=4)
+        results = await asyncio.gather(consume(a, log, 0), consume(b, log, 5))
+        assert max(log) == 4
+        return list(results)
+
+    assert _run(main()) == [list(range(50))] * 2
+
+
+async def _ticks(name: str, count: int, delay: float) -> AsyncIterator[str]:
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield f"{name}{i}"
+
+
+def test_interleave_ready() -> None:
+    result = _collect(aio.interleave_ready(_ticks("a", 5, 0.002), _ticks("b", 3, 0.005), "xy"))
+    assert sorted(result) == sorted(["a0", "a1", "a2", "a3", "a4", "b0", "b1", "b2", "x", "y"])
+    for name in "ab":
+        values = [v for v in result if v[0] == name]
+        assert values == sorted(values)
+    assert result.index("b0") < result.index("a4")
+    assert _collect(aio.interleave_ready()) == []
+
+
+def test_interleave_ready_fair() -> None:
+    async def main() -> List[str]:
+        merged = aio.interleave_ready(_agen(iter(int, 1)), _ticks("slow", 3, 0))
+        result = [str(value) async for value in aio.islice(merged, 30)]
+        await merged.aclose()
+        return result
+
+    result = _run(main())
+    assert ["slow0", "slow1", "slow2"] == [v for v in result if v.startswith("slow")]
+
+
+def test_interleave_ready_error() -> None:
+    async def failing() -> AsyncIterator[int]:
+        yield 1
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        _collect(aio.interleave_ready(failing(), _ticks("a", 100, 0.001)))
+
+
+def test_interleave_ready_after_close() -> None:
+    async def failing() -> AsyncIterator[int]:
+        yield 1
+        raise RuntimeError("boom")
+
+    async def main() -> None:
+        merged = aio.interleave_ready(failing(), _ticks("a", 100, 0.001))
+        with pytest.raises(RuntimeError):
+            async for _ in merged:
+                pass
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(merged.__anext__(), 1)
+
+        merged = aio.interleave_ready(_ticks("a", 100, 0.001), _ticks("b", 100, 0.001))
+        await merged.__anext__()
+        await merged.aclose()
+        await asyncio.sleep(0.01)
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(merged.__anext__(), 1)
+
+    _run(main())
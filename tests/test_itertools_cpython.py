@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+# SPDX-License-Identifier: MIT
+
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Any, Iterator, Tuple, TypeVar
+
+import pytest
+
+import adafruit_itertools as ait
+from adafruit_itertools import adafruit_itertools_cpython as acpy
+from adafruit_itertools import adafruit_itertools_extras as aextras
+
+_T = TypeVar("_T")
+
+
+def _first(record: Tuple[_T, ...]) -> _T:
+    return record[0]
+
+
+def test_map_shards() -> None:
+    expected = list(ait.combinations("abcdefg", 3))
+    assert acpy.map_shards(list, ait.combinations, "abcdefg", 3, shards=4, processes=2) == [
+        list(ait.combinations("abcdefg", 3, shard=(k, 4))) for k in range(4)
+    ]
+    assert sum(acpy.map_shards(aextras.quantify, ait.permutations, "abcdef", processes=2)) == 720
+    assert sum(acpy.map_shards(list, ait.combinations, "abcdefg", 3, shards=3), []) == expected
+
+
+def _slow_pow(x: int, y: int) -> int:
+    time.sleep(0.01 * (x % 3))
+    return x**y
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_starmap(executor: str) -> None:
+    args = [(x, 2) for x in range(20)]
+    expected = list(itertools.starmap(pow, args))
+    assert list(acpy.parallel_starmap(_slow_pow, args, executor, workers=4)) == expected
+    unordered = list(acpy.parallel_starmap(_slow_pow, args, executor, 4, ordered=False))
+    assert sorted(unordered) == sorted(expected)
+    with pytest.raises(ValueError):
+        acpy.parallel_starmap(pow, args, "fiber")
+
+
+def test_parallel_starmap_bounded() -> None:
+    submitted = []
+
+    def source() -> Iterator[Tuple[int]]:
+        for x in itertools.count():
+            submitted.append(x)
+            yield (x,)
+
+    results = acpy.parallel_starmap(abs, source(), workers=2, prefetch=5)
+    assert list(itertools.islice(results, 10)) == list(range(10))
+    # At most prefetch calls in flight, plus at most prefetch finished ones held.
+    assert len(submitted) <= 10 + 2 * 5
+    results.close()  # type: ignore[attr-defined]
+
+
+def test_parallel_starmap_error() -> None:
+    started = []
+
+    def work(x: int) -> int:
+        started.append(x)
+        if x == 3:
+            raise KeyError(x)
+        time.sleep(0.05 if x == 0 else 0)
+        return x
+
+    with pytest.raises(KeyError):
+        list(acpy.parallel_starmap(work, ((x,) for x in range(1000)), workers=2, prefetch=4))
+    assert len(started) < 20
+
+
+def test_prefetch() -> None:
+    assert list(acpy.prefetch(range(100), 8)) == list(range(100))
+    assert list(acpy.prefetch(iter(""))) == []
+    with pytest.raises(ValueError):
+        acpy.prefetch("abc", 0)
+
+
+def test_prefetch_error() -> None:
+    def source() -> Iterator[int]:
+        yield 1
+        yield 2
+        raise KeyError("boom")
+
+    result = acpy.prefetch(source(), 4)
+    assert next(result) == 1
+    assert next(result) == 2
+    with pytest.raises(KeyError):
+        next(result)
+
+
+def test_prefetch_close() -> None:
+    produced = []
+
+    def source() -> Iterator[int]:
+        for x in itertools.count():
+            produced.append(x)
+            yield x
+
+    result = acpy.prefetch(source(), 3)
+    assert list(itertools.islice(result, 5)) == list(range(5))
+    result.close()  # type: ignore[attr-defined]
+    time.sleep(0.2)
+    count = len(produced)
+    time.sleep(0.2)
+    assert len(produced) == count <= 5 + 3 + 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 5000])
+def test_sorted_external(chunk_size: int, tmp_path: Any) -> None:
+    rng = random.Random(chunk_size)
+    records = [(rng.randint(0, 30), i) for i in range(1000)]
+    result = acpy.sorted_external(iter(records), _first, chunk_size, str(tmp_path))
+    assert list(result) == sorted(records, key=_first)
+    assert list(tmp_path.iterdir()) == []
+    assert list(acpy.sorted_external([], chunk_size=chunk_size)) == []
+
+
+def test_sorted_external_groupby() -> None:
+    rng = random.Random(5)
+    records = [(rng.choice("abcdef"), rng.random()) for _ in range(500)]
+    serializer = acpy.StructSerializer("<cd")
+    encoded = [(k.encode(), x) for k, x in records]
+    groups = [
+        (k, len(list(g)))
+        for k, g in ait.groupby(
+            acpy.sorted_external(encoded, _first, 50, serializer=serializer), _first
+        )
+    ]
+    assert groups == sorted(Counter(k.encode() for k, _ in records).items())
+
+
+def test_struct_serializer() -> None:
+    values = [random.Random(2).random() * i for i in range(3000)]
+    result = acpy.sorted_external(values, chunk_size=100, serializer=acpy.StructSerializer("d"))
+    assert list(result) == sorted(values)
+    with pytest.raises(ValueError):
+        acpy.sorted_external(values, chunk_size=0)
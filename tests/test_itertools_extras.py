@@ -1,11 +1,23 @@
 # SPDX-FileCopyrightText: KB Sriram
 # SPDX-License-Identifier: MIT
 
+import heapq
+import itertools
+import math
+import random
+import statistics
+import time
+from array import array
+from collections import Counter
 from typing import (
+    Any,
     Callable,
+    Dict,
     Iterator,
+    List,
     Optional,
     Sequence,
+    Tuple,
     TypeVar,
 )
 
@@ -13,6 +25,7 @@ import more_itertools as itextras
 import pytest
 from typing_extensions import TypeAlias
 
+import adafruit_itertools as ait
 from adafruit_itertools import adafruit_itertools_extras as aextras
 
 _K = TypeVar("_K")
@@ -21,11 +34,45 @@ _S = TypeVar("_S")
 _Predicate: TypeAlias = Callable[[_T], bool]
 
 
+def _first(record: Tuple[_T, ...]) -> _T:
+    return record[0]
+
+
 def _take(n: int, iterator: Iterator[_T]) -> Sequence[_T]:
     """Extract the first n elements from a long/infinite iterator."""
     return [v for _, v in zip(range(n), iterator)]
 
 
+@pytest.mark.parametrize(
+    ("reducer", "fold"),
+    [("count", None), ("sum", sum), ("min", min), ("max", max), (lambda a, x: a * x, math.prod)],
+)
+def test_aggregate_by(reducer: Any, fold: Optional[Callable[[List[int]], int]]) -> None:
+    rng = random.Random(3)
+    records = [(rng.choice("abcdefg"), rng.randint(1, 9)) for _ in range(300)]
+    groups: Dict[str, List[int]] = {}
+    for name, x in records:
+        groups.setdefault(name, []).append(x)
+    expected = {k: len(v) if fold is None else fold(v) for k, v in groups.items()}
+    result = list(aextras.aggregate_by(iter(records), lambda r: r[0], reducer, lambda r: r[1]))
+    assert result == list(expected.items())
+
+
+def test_aggregate_by_max_keys() -> None:
+    data = "abcabdaeabfc" * 5
+    pairs = list(aextras.aggregate_by(data, max_keys=3))
+    totals: Dict[str, int] = {}
+    for k, count in pairs:
+        totals[k] = totals.get(k, 0) + count
+    assert totals == {k: data.count(k) for k in set(data)}
+    assert len(pairs) > len(totals)
+    assert list(aextras.aggregate_by("", reducer="sum")) == []
+    with pytest.raises(ValueError):
+        aextras.aggregate_by(data, reducer="mean")
+    with pytest.raises(ValueError):
+        aextras.aggregate_by(data, max_keys=0)
+
+
 @pytest.mark.parametrize(
     "data",
     [
@@ -43,6 +90,120 @@ def test_all_equal(data: Sequence[_T]) -> None:
     assert itextras.all_equal(data) == aextras.all_equal(data)
 
 
+@pytest.mark.parametrize(("seq", "n"), [("ABCDEFG", 3), ("ABCDEF", 3), ("", 2), ("AB", 5)])
+def test_batched(seq: str, n: int) -> None:
+    expected = list(itextras.batched(seq, n))
+    assert list(aextras.batched(seq, n)) == expected
+    assert list(aextras.batched(iter(seq), n)) == expected
+    assert "".join(aextras.unbatched(aextras.batched(seq, n))) == seq
+    with pytest.raises(ValueError):
+        aextras.batched(seq, 0)
+
+
+def test_batched_into() -> None:
+    values = [x / 4 for x in range(10)]
+    buf = array("d", [0.0] * 4)
+    batches = [view.tolist() for view in aextras.batched(values, 4, into=buf)]
+    assert batches == [list(batch) for batch in itextras.batched(values, 4)]
+    assert list(aextras.unbatched(aextras.batched(values, 3, into=buf))) == values
+    raw = bytearray(8)
+    assert [bytes(v) for v in aextras.batched(b"abcdefghij", 8, into=raw)] == [b"abcdefgh", b"ij"]
+    with pytest.raises(ValueError):
+        aextras.batched(values, 5, into=buf)
+
+
+@pytest.mark.parametrize(
+    ("seq", "n"),
+    [
+        ("abcdefg", 3),
+        ("abcdef", 3),
+        ("ab", 3),
+        ("", 2),
+    ],
+)
+def test_chunked(seq: str, n: int) -> None:
+    assert list(itextras.chunked(seq, n)) == list(aextras.chunked(seq, n))
+    assert list(itextras.chunked(iter(seq), n)) == list(aextras.chunked(iter(seq), n))
+    buf = bytearray(seq, "ascii")
+    chunks = list(aextras.chunked(buf, n))
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert [bytes(chunk) for chunk in chunks] == [
+        bytes(chunk) for chunk in itextras.chunked(buf, n)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("seq", "r"),
+    [
+        ("abcde", 0),
+        ("abcde", 2),
+        ("abcde", 5),
+        ("abcdefg", 3),
+    ],
+)
+def test_nth_combination(seq: str, r: int) -> None:
+    combos = list(itertools.combinations(seq, r))
+    assert aextras.combination_count(len(seq), r) == len(combos)
+    for index, combo in enumerate(combos):
+        assert aextras.nth_combination(seq, r, index) == combo
+        assert aextras.nth_combination(seq, r, index - len(combos)) == combo
+        assert aextras.combination_index(combo, seq) == index
+    with pytest.raises(IndexError):
+        aextras.nth_combination(seq, r, len(combos))
+    with pytest.raises(ValueError):
+        aextras.combination_index("z", seq)
+
+
+@pytest.mark.parametrize(
+    ("seq", "r"),
+    [
+        ("abcd", None),
+        ("abcd", 0),
+        ("abcd", 2),
+        ("abcdef", 3),
+    ],
+)
+def test_nth_permutation(seq: str, r: Optional[int]) -> None:
+    perms = list(itertools.permutations(seq, r))
+    assert aextras.permutation_count(len(seq), r) == len(perms)
+    for index, perm in enumerate(perms):
+        assert aextras.nth_permutation(seq, r, index) == perm
+        assert itextras.nth_permutation(seq, r, index) == perm
+        assert aextras.permutation_index(perm, seq) == index
+    with pytest.raises(IndexError):
+        aextras.nth_permutation(seq, r, len(perms))
+    with pytest.raises(ValueError):
+        aextras.permutation_index("z", seq)
+
+
+@pytest.mark.parametrize(
+    "pools",
+    [
+        ("ab", "xyz"),
+        (range(2),) * 4,
+        ("abc",),
+    ],
+)
+def test_nth_product(pools: Sequence[Sequence[_T]]) -> None:
+    prods = list(itertools.product(*pools))
+    assert aextras.product_count(*map(len, pools)) == len(prods)
+    for index, prod in enumerate(prods):
+        assert aextras.nth_product(index, *pools) == prod
+        assert aextras.nth_product(index - len(prods), *pools) == prod
+        assert aextras.product_index(prod, *pools) == index
+    with pytest.raises(IndexError):
+        aextras.nth_product(len(prods), *pools)
+    with pytest.raises(ValueError):
+        aextras.product_index(("q",) * len(pools), *pools)
+
+
+def test_nth_large_index() -> None:
+    pool = range(40)
+    assert aextras.nth_combination(pool, 20, 10**9) == itextras.nth_combination(pool, 20, 10**9)
+    assert aextras.nth_permutation(pool, 20, 10**9) == itextras.nth_permutation(pool, 20, 10**9)
+    assert aextras.combination_index(itextras.nth_combination(pool, 20, 10**9), pool) == 10**9
+
+
 @pytest.mark.parametrize(
     ("vec1", "vec2"),
     [
@@ -56,6 +217,17 @@ def test_dotproduct(vec1: Sequence[int], vec2: Sequence[int]) -> None:
     assert itextras.dotproduct(vec1, vec2) == aextras.dotproduct(vec1, vec2)
 
 
+def test_dotproduct_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    vec1 = [0.5, 1.5, -2.0, 4.0]
+    vec2 = [2.0, 3.0, 1.0]
+    expected = itextras.dotproduct(vec1, vec2)
+    assert aextras.dotproduct(array("d", vec1), array("f", vec2)) == pytest.approx(expected)
+    assert type(aextras.dotproduct(array("d", vec1), memoryview(array("d", vec2)))) is float
+    assert aextras.dotproduct(np.array(vec1), np.array(vec2)) == pytest.approx(expected)
+    assert aextras.dotproduct(array("q", [2**62, 1]), array("q", [4, 1])) == 2**64 + 1
+
+
 @pytest.mark.parametrize(
     ("seq", "dflt", "pred"),
     [
@@ -117,6 +289,31 @@ def test_iter_except(data: Sequence[int]) -> None:
     )
 
 
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 7, 64, 100])
+def test_merge(k: int) -> None:
+    rng = random.Random(k)
+    sources = [
+        sorted((rng.randint(0, 20), i, j) for j in range(rng.randint(0, 15))) for i in range(k)
+    ]
+    assert list(aextras.merge(*sources, key=_first)) == list(heapq.merge(*sources, key=_first))
+    descending = [source[::-1] for source in sources]
+    assert list(aextras.merge(*map(iter, descending), key=_first, reverse=True)) == sorted(
+        itertools.chain(*descending), key=_first, reverse=True
+    )
+    plain = [sorted(rng.random() for _ in range(rng.randint(0, 9))) for _ in range(k)]
+    assert list(aextras.merge(*plain)) == sorted(itertools.chain(*plain))
+
+
+def test_merge_drains_last() -> None:
+    def source() -> Iterator[int]:
+        yield 1
+        yield from itertools.count(10)
+
+    merged = aextras.merge([0, 2, 3], source())
+    assert _take(6, merged) == [0, 1, 2, 3, 10, 11]
+    assert list(aextras.merge("ace", "", "bdf")) == list("abcdef")
+
+
 @pytest.mark.parametrize(
     ("seq", "count"),
     [
@@ -127,6 +324,8 @@ def test_iter_except(data: Sequence[int]) -> None:
 )
 def test_ncycles(seq: str, count: int) -> None:
     assert list(itextras.ncycles(seq, count)) == list(aextras.ncycles(seq, count))
+    assert list(itextras.ncycles(seq, count)) == list(aextras.ncycles(seq, count, True))
+    assert list(aextras.ncycles(iter(range(3000)), 2, compact=True)) == list(range(3000)) * 2
 
 
 @pytest.mark.parametrize(
@@ -142,6 +341,14 @@ def test_nth(seq: str, n: int, dflt: Optional[str]) -> None:
     assert itextras.nth(seq, n, dflt) == aextras.nth(seq, n, dflt)
 
 
+def test_nth_take_negative() -> None:
+    for source in ("abcde", iter("abcde")):
+        with pytest.raises(ValueError):
+            aextras.nth(source, -1)
+        with pytest.raises(ValueError):
+            aextras.take(-2, source)
+
+
 @pytest.mark.parametrize(
     ("seq"),
     [
@@ -165,6 +372,7 @@ def test_padnone(seq: str) -> None:
 )
 def test_pairwise(seq: Sequence[int]) -> None:
     assert list(itextras.pairwise(seq)) == list(aextras.pairwise(seq))
+    assert list(itextras.pairwise(iter(seq))) == list(aextras.pairwise(iter(seq)))
 
 
 @pytest.mark.parametrize(
@@ -182,6 +390,11 @@ def test_partition(pred: _Predicate[int], seq: Sequence[int]) -> None:
     assert list(true1) == list(true2)
     assert list(false1) == list(false2)
 
+    true1, false1 = itextras.partition(pred, iter(seq))
+    true2, false2 = aextras.partition(pred, iter(seq))
+    assert list(true1) == list(true2)
+    assert list(false1) == list(false2)
+
 
 @pytest.mark.parametrize(
     ("value", "seq"),
@@ -207,6 +420,147 @@ def test_quantify(seq: Sequence[int], pred: _Predicate[int]) -> None:
     assert itextras.quantify(seq, pred) == aextras.quantify(seq, pred)
 
 
+def test_quantify_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    values = [0.0, -0.0, 1.5, float("nan"), 0.0, -3.0]
+    expected = itextras.quantify(values)
+    assert aextras.quantify(array("d", values)) == expected
+    assert aextras.quantify(np.array(values)) == expected
+    assert aextras.quantify(array("i", [0, 5, 0, 7])) == 2
+
+
+@pytest.mark.parametrize("data", ["AAAABBBCCDAAA", "", "A", "ABAB", [1, 1.0, True, 2]])
+def test_run_length(data: Sequence[Any]) -> None:
+    expected = list(itextras.run_length.encode(data))
+    assert list(aextras.run_length.encode(data)) == expected
+    assert list(aextras.run_length.encode(iter(data))) == expected
+    assert list(aextras.run_length.decode(expected)) == list(data)
+    assert list(aextras.run_length.decode(iter(expected))) == list(data)
+
+
+def test_run_length_key() -> None:
+    pairs = list(aextras.run_length.encode("aAbBBcA", key=str.lower))
+    assert pairs == [("a", 2), ("b", 3), ("c", 1), ("A", 1)]
+    assert "".join(aextras.run_length.decode(pairs)) == "aabbbcA"
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 40])
+def test_running(n: int) -> None:
+    rng = random.Random(n)
+    values = [rng.randint(-50, 50) for _ in range(200)]
+    windows = [w for w in itextras.windowed(values, n) if None not in w]
+    assert list(aextras.running_sum(values, n)) == [sum(w) for w in windows]
+    assert list(aextras.running_mean(iter(values), n)) == [sum(w) / n for w in windows]
+    assert list(aextras.running_min(values, n)) == [min(w) for w in windows]
+    assert list(aextras.running_max(iter(values), n)) == [max(w) for w in windows]
+    floats = [x / 7 + 1e6 for x in values]
+    fwindows = [w for w in itextras.windowed(floats, n) if None not in w]
+    for ddof in {0, n - 1}:
+        variances = list(aextras.running_variance(floats, n, ddof))
+        assert variances == pytest.approx(
+            [statistics.pvariance(w) * n / (n - ddof) for w in fwindows], rel=1e-6, abs=1e-6
+        )
+    assert list(aextras.running_sum([1, 2], 3)) == []
+
+
+def test_running_errors() -> None:
+    for func in (
+        aextras.running_sum,
+        aextras.running_mean,
+        aextras.running_min,
+        aextras.running_max,
+        aextras.running_variance,
+    ):
+        with pytest.raises(ValueError):
+            func([1, 2, 3], 0)
+    with pytest.raises(ValueError):
+        aextras.running_variance([1, 2, 3], 2, ddof=2)
+
+
+def test_ewma() -> None:
+    assert list(aextras.ewma([0, 4, 8], 0.5)) == [0, 2.0, 5.0]
+    assert list(aextras.ewma(iter([3, 9, -1]), 1)) == [3, 9, -1]
+    assert list(aextras.ewma([], 0.1)) == []
+    for alpha in (0, 1.5):
+        with pytest.raises(ValueError):
+            aextras.ewma([1], alpha)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"a",
+        b"aaaa",
+        b"aaab",
+        bytearray(b"\0\0"),
+        bytearray(b"\0\0\3\0"),
+        array("d", [1.5, 1.5, 1.5]),
+        array("d", [0.0, -0.0, float("nan"), 2.0]),
+        array("i", [0, 0, 7, 0, -1]),
+        array("u", "aab"),
+        memoryview(b"\0\0\0x"),
+        memoryview(array("h", [3, 3, 3])),
+    ],
+)
+def test_buffer_reducers(data: Any) -> None:
+    values = list(data)
+    assert aextras.all_equal(data) == itextras.all_equal(values)
+    assert aextras.quantify(data) == itextras.quantify(values)
+    assert repr(aextras.first_true(data, "none")) == repr(itextras.first_true(values, "none"))
+    for n in range(len(values) + 2):
+        assert repr(aextras.nth(data, n, "none")) == repr(itextras.nth(values, n, "none"))
+
+
+def test_first_true_long_buffers() -> None:
+    for zeros in (0, 4095, 4096, 10000):
+        assert aextras.first_true(bytes(zeros) + b"\7\0") == 7
+        assert aextras.first_true(bytearray(zeros)) is False
+        assert aextras.first_true(array("d", [0.0] * zeros + [-0.0, 2.5, 0.0])) == 2.5
+        assert aextras.first_true(memoryview(array("b", [0] * zeros + [-3]))) == -3
+        assert aextras.first_true(array("i", [0] * zeros), "none") == "none"
+
+
+def test_buffer_reducers_basic_memoryview(monkeypatch: pytest.MonkeyPatch) -> None:
+    class BasicView:
+        """A memoryview without format, ndim or tolist, as in CircuitPython."""
+
+        def __init__(self, obj: Any) -> None:
+            self.view = memoryview(obj)
+
+        def __len__(self) -> int:
+            return len(self.view)
+
+    monkeypatch.setattr(aextras, "memoryview", BasicView, raising=False)
+    monkeypatch.setattr(ait, "_np", False)
+    data = array("i", [0, 3, 3, 0])
+    assert aextras.all_equal(data) is False
+    assert aextras.all_equal(array("i", [3, 3])) is True
+    assert aextras.quantify(data) == 2
+
+    class BasicBytes(bytes):
+        """bytes whose count() takes no int, as in CircuitPython."""
+
+        def count(self, sub: Any, *args: Any) -> int:
+            if isinstance(sub, int):
+                raise TypeError("can't convert int to bytes")
+            return super().count(sub, *args)
+
+    class BasicBytearray(bytearray):
+        """A bytearray without count(), as in CircuitPython."""
+
+        def __getattribute__(self, name: str) -> Any:
+            if name == "count":
+                raise AttributeError(name)
+            return super().__getattribute__(name)
+
+    for kind in (BasicBytes, BasicBytearray):
+        assert aextras.all_equal(kind(b"\0\3\3")) is False
+        assert aextras.all_equal(kind(b"\3\3")) is True
+        assert aextras.quantify(kind(b"\0\3\3")) == 2
+        assert aextras.first_true(kind(b"\0\0\5")) == 5
+
+
 @pytest.mark.parametrize(
     ("func", "times", "args"),
     [
@@ -240,6 +594,35 @@ def test_roundrobin(seq1: str, seq2: str) -> None:
     assert list(itextras.roundrobin(seq1, seq2)) == list(aextras.roundrobin(seq1, seq2))
 
 
+@pytest.mark.parametrize(
+    ("seq", "n", "step"),
+    [
+        ("abcdefg", 3, 1),
+        ("abcdefg", 3, 2),
+        ("abcdefg", 2, 4),
+        ("abcdefg", 7, 1),
+        ("abc", 4, 1),
+        ("", 1, 1),
+    ],
+)
+def test_sliding_window(seq: str, n: int, step: int) -> None:
+    expected = [w for w in itextras.windowed(seq, n, step=step) if None not in w]
+    assert list(aextras.sliding_window(seq, n, step)) == expected
+    assert list(aextras.sliding_window(iter(seq), n, step)) == expected
+    windows = list(aextras.sliding_window(array("b", seq.encode()), n, step))
+    assert all(isinstance(w, memoryview) for w in windows)
+    assert [tuple(map(chr, w)) for w in windows] == expected
+
+
+def test_sliding_window_shares_memory() -> None:
+    buf = bytearray(b"abcd")
+    first = next(aextras.sliding_window(buf, 2))
+    buf[0] = ord("z")
+    assert bytes(first) == b"zb"
+    with pytest.raises(ValueError):
+        aextras.sliding_window(buf, 0)
+
+
 @pytest.mark.parametrize(
     ("func", "start"),
     [
@@ -258,11 +641,15 @@ def test_tabulate(func: Callable[[int], int], start: int) -> None:
         (3, "abcdefg"),
         (0, "abcdefg"),
         (10, "abcdefg"),
+        (7, "abcdefg"),
         (5, ""),
     ],
 )
 def test_tail(n: int, seq: str) -> None:
     assert list(itextras.tail(n, seq)) == list(aextras.tail(n, seq))
+    assert list(itextras.tail(n, iter(seq))) == list(aextras.tail(n, iter(seq)))
+    assert list(itextras.tail(n, set(seq))) == list(aextras.tail(n, set(seq)))
+    assert list(itextras.tail(n, dict.fromkeys(seq))) == list(aextras.tail(n, dict.fromkeys(seq)))
 
 
 @pytest.mark.parametrize(